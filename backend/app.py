@@ -1,12 +1,30 @@
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, request, jsonify, make_response, Response, stream_with_context
 from utils.extractor import extract_text, extract_info
-from utils.question_generator import generate_questions, generate_expected_answers
+from utils.question_generator import generate_questions, generate_expected_answers, stream_questions, iter_expected_answers
+from utils.answer_evaluator import compare_and_provide_feedback, stream_feedback, extract_keywords_for_answers, FeedbackStreamInterrupted
+from utils.cache import TTLCache, TieredCache
+from utils.scoring import get_answer_index, score_answer
+from utils import skill_gazetteer
+from utils.db_indexes import ensure_indexes, missing_unique_indexes, answer_progress_pipeline, QUESTION_SUMMARY_PROJECTION, ANSWER_SUMMARY_PROJECTION
+from utils.pagination import fetch_page, iter_json_array, InvalidCursor
+from utils import resources
+from utils.llm_transport import transport_stats
+from utils.llm_cache import llm_cache
+from utils import password_hashing
+from utils.password_hashing import HashingSaturated
 import os
+import hashlib
+import tempfile
+import time
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from flask_cors import CORS
 from dotenv import load_dotenv
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
+from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime, timedelta
-import bcrypt
 import jwt
 import uuid
 import traceback
@@ -24,22 +42,61 @@ CORS(app,
      origins=["https://test-qccn.onrender.com","https://test-c3yt-abhinavs-projects-8f0d61e5.vercel.app"], 
      supports_credentials=True,
      allow_headers=["Content-Type", "Authorization"],
+     expose_headers=["X-Next-Cursor"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Uploads larger than this (bytes) are spooled to disk before parsing
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Request bodies above this are rejected with 413 before anything is read
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
 
 JWT_SECRET = os.getenv("JWT_SECRET", "555")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION = 24  # hours
 
+# Decoded sessions (token -> user without password) reused by token_required
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1024"))
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "60"))  # seconds
+SESSION_USER_PROJECTION = {"password": 0}
+session_cache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+
+# Bump when the models, prompts or skill/question selection change so stale
+# cached results are not reused
+PIPELINE_VERSION = "mixtral-8x7b-instruct-v0.1/prompts-v3"
+RESUME_CACHE_SIZE = int(os.getenv("RESUME_CACHE_SIZE", "64"))
+RESUME_CACHE_TTL = int(os.getenv("RESUME_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+resume_cache = TieredCache(maxsize=RESUME_CACHE_SIZE, ttl=RESUME_CACHE_TTL)
+
+# Background workers for asynchronous question set generation
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="question-set-job")
+# Question sets queued or running in this process, marked failed if it shuts down first
+_active_jobs = set()
+_active_jobs_lock = threading.Lock()
+# In-progress question sets not updated for this long are reported as failed
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "1800"))
+IN_PROGRESS_STATUSES = ["pending", "processing", "questions_ready"]
+
+# History page sizes (?limit=)
+MAX_HISTORY_PAGE_SIZE = int(os.getenv("MAX_HISTORY_PAGE_SIZE", "200"))
+
+# Batch answer submission limits
+MAX_BATCH_ANSWERS = int(os.getenv("MAX_BATCH_ANSWERS", "50"))
+BATCH_FEEDBACK_WORKERS = int(os.getenv("BATCH_FEEDBACK_WORKERS", "4"))
+
 # Global variables for MongoDB client and collections
 client = None
 collections = None
+# Set once the unique email/username indexes are confirmed at connect time
+user_indexes_ready = False
 
 # MongoDB connection with better error handling
 def connect_to_mongodb():
-    global client, collections # Ensure these are global variables
+    global client, collections, user_indexes_ready # Ensure these are global variables
+    started = time.perf_counter()
     try:
         print("Attempting to connect to MongoDB...")
         # Update your MongoDB connection string here if it's incorrect or needs adjustment
@@ -70,11 +127,31 @@ def connect_to_mongodb():
         
         # Create indexes with error handling
         try:
-            collections['users'].create_index("email", unique=True)
-            collections['users'].create_index("username", unique=True)
-            print("✅ Database indexes created successfully")
+            index_problems = ensure_indexes(db)
+            for problem in index_problems:
+                print(f"⚠️ Index creation warning: {problem}")
+            if not index_problems:
+                print("✅ Database indexes created successfully")
         except Exception as e:
             print(f"⚠️ Index creation warning: {e}")
+
+        # Registration relies on the unique indexes to reject duplicate accounts
+        try:
+            missing = missing_unique_indexes(db, "users")
+        except Exception as e:
+            missing = [f"unknown ({e})"]
+        user_indexes_ready = not missing
+        if missing:
+            print(f"❌ Unique user indexes missing, registration disabled: {missing}")
+
+        resume_cache.attach_collection(db["resume_cache"])
+        if os.getenv("LLM_CACHE_PERSISTENT", "1") == "1":
+            llm_cache.attach_collection(db["llm_cache"])
+        resources.record_timing("mongodb", time.perf_counter() - started)
+
+        # Grow the skill taxonomy with skills the LLM extractor keeps returning
+        skill_gazetteer.attach_collection(db["learned_skills"])
+        job_executor.submit(skill_gazetteer.refresh_from_collection)
             
         return client, collections
         
@@ -82,6 +159,10 @@ def connect_to_mongodb():
         print(f"❌ MongoDB connection failed: {e}")
         print("🔄 Falling back to local development mode...")
         client = None # Explicitly set to None on failure
+        user_indexes_ready = False
+        resume_cache.attach_collection(None)
+        skill_gazetteer.attach_collection(None)
+        llm_cache.attach_collection(None)
         collections = { # Explicitly set to None for all collections
             'users': None,
             'questions': None,
@@ -89,12 +170,26 @@ def connect_to_mongodb():
         }
         return None, None
 
-# Try to connect to MongoDB when the application starts
-client, collections = connect_to_mongodb()
+# Try to connect to MongoDB when the application starts. Under gunicorn --preload the
+# connection is made in each worker after fork instead (see gunicorn.conf.py), since
+# MongoClient is not fork-safe.
+if os.getenv("DEFER_MONGO_CONNECT") != "1":
+    client, collections = connect_to_mongodb()
+
+# Load spaCy, NLTK data and the LLM client off the request path. With --preload the
+# gunicorn master loads them before forking instead, so workers share the memory.
+if os.getenv("RESOURCE_WARMUP", "background") == "background":
+    resources.warm_up(background=True)
 
 def cleanup_resources():
     """Clean up database connections on shutdown"""
     try:
+        with _active_jobs_lock:
+            interrupted = list(_active_jobs)
+            _active_jobs.clear()
+        job_executor.shutdown(wait=False, cancel_futures=True)
+        if interrupted and collections and collections['questions'] is not None:
+            mark_question_sets_failed(interrupted, "Interrupted by a server restart. Please upload again.")
         if client:
             print("🧹 Cleaning up database connections...")
             client.close()
@@ -113,35 +208,245 @@ atexit.register(cleanup_resources)
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
+def invalidate_user_sessions(user_id):
+    """Forget cached sessions of a user whose document changed or was removed"""
+    return session_cache.pop_where(lambda user: user['_id'] == user_id)
+
+def load_session(token):
+    """User for a session token, served from session_cache when possible.
+
+    Raises ``jwt.InvalidTokenError`` for bad or expired tokens and returns None
+    when the user no longer exists.
+    """
+    current_user = session_cache.get(token)
+    if current_user is not None:
+        return current_user
+
+    data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    current_user = collections['users'].find_one({"_id": data['user_id']}, SESSION_USER_PROJECTION)
+    if current_user:
+        # Never keep a session cached past the token's own expiry
+        remaining = data['exp'] - time.time() if 'exp' in data else SESSION_CACHE_TTL
+        if remaining > 0:
+            session_cache.set(token, current_user, ttl=min(SESSION_CACHE_TTL, remaining))
+    return current_user
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        print(f"DEBUG: Entering token_required. Client connected: {client is not None}, Users collection available: {collections and collections['users'] is not None}")
         # Check if collections is None or if the specific collection is None
         if collections is None or collections['users'] is None:
-            print("DEBUG: Database or users collection unavailable for token_required route. Returning 503.")
             return jsonify({'message': 'Database unavailable - running in local mode'}), 503
             
         token = request.cookies.get('token')
         if not token:
-            print("DEBUG: Token missing.")
             return jsonify({'message': 'Token is missing!'}), 401
         try:
-            data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            current_user = collections['users'].find_one({"_id": data['user_id']})
+            current_user = load_session(token)
             if not current_user:
-                print(f"DEBUG: User not found for ID: {data['user_id']}.")
                 return jsonify({'message': 'User not found!'}), 401
         except jwt.ExpiredSignatureError:
-            print("DEBUG: Token expired.")
             return jsonify({'message': 'Token has expired!'}), 401
         except jwt.InvalidTokenError:
-            print("DEBUG: Invalid token.")
             return jsonify({'message': 'Invalid token!'}), 401
-        print(f"DEBUG: Token valid for user: {current_user['username']}")
         return f(current_user, *args, **kwargs)
     return decorated
 
+def get_optional_user_id():
+    """User id from the session cookie, or "public_user" for anonymous requests.
+
+    Only the JWT is checked; answer submission stays open to signed-out users.
+    """
+    token = request.cookies.get('token')
+    if token:
+        try:
+            return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])['user_id']
+        except (jwt.InvalidTokenError, KeyError):
+            pass
+    return "public_user"
+
+def resume_cache_key(digest, filename):
+    """Content-addressed cache key for an uploaded resume, given its SHA-256 hex digest.
+
+    The lowercased extension is part of the key because it decides how the
+    bytes are parsed (the same bytes named .txt extract no text).
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    return f"{PIPELINE_VERSION}:{extension}:{digest}"
+
+def read_upload(file, content_length=None):
+    """Read an uploaded file once, hashing it in chunks as it goes.
+
+    Returns ``(source, digest)``. ``source`` is the file's bytes when
+    ``content_length`` (the request body size) shows it fits within
+    UPLOAD_SPOOL_THRESHOLD; otherwise, or when the size is unknown, the file is
+    copied to a uniquely named temporary file and ``source`` is its path.
+    Pass ``source`` to discard_upload once it is no longer needed.
+    """
+    sha = hashlib.sha256()
+    if content_length is not None and content_length <= UPLOAD_SPOOL_THRESHOLD:
+        chunks = []
+        for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b""):
+            sha.update(chunk)
+            chunks.append(chunk)
+        return b"".join(chunks), sha.hexdigest()
+
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    with tempfile.NamedTemporaryFile(dir=UPLOAD_FOLDER, suffix=suffix, delete=False) as tmp:
+        try:
+            for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b""):
+                sha.update(chunk)
+                tmp.write(chunk)
+        except Exception:
+            tmp.close()
+            discard_upload(tmp.name)
+            raise
+    return tmp.name, sha.hexdigest()
+
+def discard_upload(source):
+    """Remove the temporary file behind a spooled upload (no-op for in-memory uploads)"""
+    if isinstance(source, str):
+        try:
+            os.remove(source)
+        except OSError:
+            pass
+
+def extract_upload_text(source, filename):
+    """Extract the text of an upload returned by read_upload (bytes or a spooled path)"""
+    if isinstance(source, str):
+        return extract_text(source)
+    return extract_text(source, filename=filename)
+
+def run_resume_pipeline(source, filename, digest, on_questions=None):
+    """Run extraction, skill detection, question and answer generation for a resume.
+
+    ``source`` and ``digest`` come from read_upload. Results are cached by the
+    SHA-256 of the file contents and its extension, so re-uploading the same
+    resume skips the whole pipeline; uploads with no extractable text are not
+    cached. ``on_questions(skills, questions)`` is called as soon as
+    questions exist, before expected answers are generated.
+    """
+    cache_key = resume_cache_key(digest, filename)
+    cached = resume_cache.get(cache_key)
+    if cached is not None:
+        print(f"DEBUG: Resume cache hit for {cache_key}")
+        if on_questions:
+            on_questions(cached["skills"], cached["questions"])
+        return cached
+
+    text = extract_upload_text(source, filename)
+    info = extract_info(text)
+    questions = generate_questions(skills=info["skills"], resume_text=text)
+    if on_questions:
+        on_questions(info["skills"], questions)
+    
+    # Generate expected answers for each question
+    expected_answers = generate_expected_answers(questions, skills=info["skills"], resume_text=text)
+    expected_keywords = extract_keywords_for_answers(expected_answers)
+
+    result = {
+        "text": text,
+        "skills": info["skills"],
+        "questions": questions,
+        "expected_answers": expected_answers,
+        "expected_keywords": expected_keywords
+    }
+    # An unreadable upload must not pin its empty result for the cache lifetime
+    if text.strip():
+        resume_cache.set(cache_key, result)
+    return result
+
+def process_resume_upload(file):
+    """Run the resume pipeline synchronously for an uploaded file"""
+    source, digest = read_upload(file, request.content_length)
+    try:
+        return run_resume_pipeline(source, file.filename, digest)
+    finally:
+        discard_upload(source)
+
+def mark_question_sets_failed(question_set_ids, error):
+    """Fail question sets that are still in progress (finished ones are left alone)"""
+    collections['questions'].update_many(
+        {"_id": {"$in": list(question_set_ids)}, "status": {"$in": IN_PROGRESS_STATUSES}},
+        {"$set": {"status": "failed", "error": error, "updated_at": datetime.utcnow()}}
+    )
+
+def is_stale_job(question_set):
+    """Whether an in-progress question set has not been updated for JOB_STALE_SECONDS"""
+    if question_set.get("status") not in IN_PROGRESS_STATUSES:
+        return False
+    last_update = question_set.get("updated_at") or question_set.get("timestamp")
+    return last_update is not None and datetime.utcnow() - last_update > timedelta(seconds=JOB_STALE_SECONDS)
+
+def run_question_set_job(question_set_id, source, filename, digest):
+    """Background job: run the resume pipeline and record progress on the question set"""
+    questions_collection = collections['questions']
+
+    def publish_questions(skills, questions):
+        questions_collection.update_one(
+            {"_id": question_set_id},
+            {"$set": {"status": "questions_ready", "skills": skills, "questions": questions, "updated_at": datetime.utcnow()}}
+        )
+
+    try:
+        questions_collection.update_one(
+            {"_id": question_set_id},
+            {"$set": {"status": "processing", "updated_at": datetime.utcnow()}}
+        )
+        result = run_resume_pipeline(source, filename, digest, on_questions=publish_questions)
+        questions_collection.update_one(
+            {"_id": question_set_id},
+            {"$set": {
+                "status": "completed",
+                "skills": result["skills"],
+                "questions": result["questions"],
+                "expected_answers": result["expected_answers"],
+                "expected_keywords": result["expected_keywords"],
+                "completed_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }}
+        )
+        print(f"DEBUG: Question set job {question_set_id} completed")
+    except Exception as e:
+        print(f"ERROR: Question set job {question_set_id} failed: {str(e)}")
+        print(f"ERROR: Traceback: {traceback.format_exc()}")
+        try:
+            questions_collection.update_one(
+                {"_id": question_set_id},
+                {"$set": {"status": "failed", "error": "Failed to process resume", "updated_at": datetime.utcnow()}}
+            )
+        except Exception as db_error:
+            print(f"ERROR: Failed to record job failure: {str(db_error)}")
+    finally:
+        discard_upload(source)
+        with _active_jobs_lock:
+            _active_jobs.discard(question_set_id)
+
+def enqueue_question_set_job(file, user_id):
+    """Create a pending question set and schedule its generation in the background.
+
+    Large uploads wait in the queue as a spooled file rather than in memory.
+    """
+    source, digest = read_upload(file, request.content_length)
+    question_set_id = str(uuid.uuid4())
+    try:
+        collections['questions'].insert_one({
+            "_id": question_set_id,
+            "user_id": user_id,
+            "status": "pending",
+            "questions": [],
+            "expected_answers": [],
+            "skills": [],
+            "timestamp": datetime.utcnow()
+        })
+    except Exception:
+        discard_upload(source)
+        raise
+    with _active_jobs_lock:
+        _active_jobs.add(question_set_id)
+    job_executor.submit(run_question_set_job, question_set_id, source, file.filename, digest)
+    return question_set_id
+
 @app.route("/", methods=["GET"])
 def health_check():
     """Health check endpoint"""
@@ -164,11 +469,39 @@ def api_health():
         "mode": "production" if client else "local_development"
     })
 
+@app.route("/api/startup-timings", methods=["GET"])
+def startup_timings():
+    """Report how long each heavy dependency took to initialize in this worker"""
+    return jsonify({"pid": os.getpid(), **resources.init_times()})
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    """Runtime metrics for this worker's caches and connection pools"""
+    return jsonify({
+        "pid": os.getpid(),
+        "llm_transport": transport_stats(),
+        "resume_cache": resume_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "session_cache": session_cache.stats(),
+        "password_hashing": password_hashing.stats()
+    })
+
+def duplicate_user_message(error):
+    """409 message for a DuplicateKeyError raised by inserting into users"""
+    details = error.details or {}
+    fields = details.get('keyPattern') or details.get('keyValue') or {}
+    if 'username' in fields or (not fields and 'username' in str(error)):
+        return "Username is already taken"
+    return "User with this email already exists"
+
 @app.route("/api/register", methods=["POST"])
 def register():
     print(f"DEBUG: /api/register endpoint hit. Users collection available: {collections and collections['users'] is not None}")
     if collections is None or collections['users'] is None:
         return jsonify({"message": "Registration not available in local mode"}), 503
+    if not user_indexes_ready:
+        # Without the unique indexes concurrent sign-ups could create duplicate accounts
+        return jsonify({"message": "Registration is temporarily unavailable. Please try again later."}), 503
         
     try:
         data = request.json
@@ -182,12 +515,7 @@ def register():
         if not username or not email or not password:
             return jsonify({"message": "All fields are required"}), 400
 
-        if collections['users'].find_one({"email": email}):
-            return jsonify({"message": "User with this email already exists"}), 409
-        if collections['users'].find_one({"username": username}):
-            return jsonify({"message": "Username is already taken"}), 409
-
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed_password = password_hashing.hash_password(password)
         new_user = {
             "_id": str(uuid.uuid4()),
             "username": username,
@@ -195,9 +523,15 @@ def register():
             "password": hashed_password,
             "created_at": datetime.utcnow()
         }
-        collections['users'].insert_one(new_user)
+        try:
+            # The unique email and username indexes reject duplicates atomically
+            collections['users'].insert_one(new_user)
+        except DuplicateKeyError as dup_error:
+            return jsonify({"message": duplicate_user_message(dup_error)}), 409
 
         return jsonify({"message": "User registered successfully"}), 201
+    except HashingSaturated:
+        return jsonify({"message": "Too many sign-ups right now. Please try again shortly."}), 429
     except Exception as e:
         print(f"Registration error: {str(e)}")
         return jsonify({"message": "Registration failed. Please try again."}), 500
@@ -223,20 +557,32 @@ def login():
         if not user:
             return jsonify({"message": "Invalid email or password"}), 401
 
-        password_bytes = password.encode('utf-8')
         stored_password = user['password']
 
-        if isinstance(stored_password, str):
-            stored_password = stored_password.encode('utf-8')
-
         try:
-            password_match = bcrypt.checkpw(password_bytes, stored_password)
+            password_match = password_hashing.check_password(password, stored_password)
             if not password_match:
                 return jsonify({"message": "Invalid email or password"}), 401
+        except HashingSaturated:
+            return jsonify({"message": "Too many login attempts right now. Please try again shortly."}), 429
         except Exception as pwd_error:
             print(f"Password check error: {str(pwd_error)}")
             return jsonify({"message": "Authentication error"}), 500
 
+        if password_hashing.needs_rehash(stored_password):
+            # Upgrade the stored hash to the current cost factor off the request path
+            users = collections['users']
+
+            def store_rehash(new_hash):
+                users.update_one(
+                    {"_id": user['_id'], "password": user['password']},
+                    {"$set": {"password": new_hash}}
+                )
+                # Every write to a user document drops its cached sessions
+                invalidate_user_sessions(user['_id'])
+
+            password_hashing.rehash_in_background(password, store_rehash)
+
         try:
             token_payload = {
                 'user_id': user['_id'],
@@ -273,6 +619,9 @@ def login():
 
 @app.route("/api/logout", methods=["POST"])
 def logout():
+    token = request.cookies.get('token')
+    if token:
+        session_cache.pop(token)
     response = make_response(jsonify({"message": "Logout successful"}))
     response.delete_cookie('token')
     return response
@@ -321,37 +670,24 @@ def upload_resume(current_user):
         if file.filename == '':
             return jsonify({"error": "No selected file"}), 400
 
-        file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-        file.save(file_path)
-
-        text = extract_text(file_path)
-        info = extract_info(text)
-        questions = generate_questions(skills=info["skills"], resume_text=text)
-        
-        # Generate expected answers for each question
-        expected_answers = generate_expected_answers(questions, skills=info["skills"], resume_text=text)
+        result = process_resume_upload(file)
         
         # Store questions and expected answers
         question_set_id = str(uuid.uuid4())
         collections['questions'].insert_one({
             "_id": question_set_id,
             "user_id": current_user['_id'],
-            "questions": questions,
-            "expected_answers": expected_answers,
-            "skills": info["skills"],
+            "questions": result["questions"],
+            "expected_answers": result["expected_answers"],
+            "expected_keywords": result["expected_keywords"],
+            "skills": result["skills"],
             "timestamp": datetime.utcnow()
         })
 
-        # Clean up uploaded file
-        try:
-            os.remove(file_path)
-        except:
-            pass
-
         return jsonify({
             "question_set_id": question_set_id,
-            "questions": questions,
-            "skills": info["skills"]
+            "questions": result["questions"],
+            "skills": result["skills"]
         })
     except Exception as e:
         print(f"Upload resume error: {str(e)}")
@@ -372,42 +708,283 @@ def upload_resume_public():
         if file.filename == '':
             return jsonify({"error": "No selected file"}), 400
 
-        file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-        file.save(file_path)
-
-        text = extract_text(file_path)
-        info = extract_info(text)
-        questions = generate_questions(skills=info["skills"], resume_text=text)
-        
-        # Generate expected answers for each question
-        expected_answers = generate_expected_answers(questions, skills=info["skills"], resume_text=text)
+        result = process_resume_upload(file)
         
         # Store questions and expected answers
         question_set_id = str(uuid.uuid4())
         collections['questions'].insert_one({
             "_id": question_set_id,
             "user_id": "public_user",
-            "questions": questions,
-            "expected_answers": expected_answers,
-            "skills": info["skills"],
+            "questions": result["questions"],
+            "expected_answers": result["expected_answers"],
+            "expected_keywords": result["expected_keywords"],
+            "skills": result["skills"],
             "timestamp": datetime.utcnow()
         })
 
-        # Clean up uploaded file
-        try:
-            os.remove(file_path)
-        except:
-            pass
-
         return jsonify({
             "question_set_id": question_set_id,
-            "questions": questions,
-            "skills": info["skills"]
+            "questions": result["questions"],
+            "skills": result["skills"]
         })
     except Exception as e:
         print(f"Upload resume public error: {str(e)}")
         return jsonify({"error": "Failed to process resume"}), 500
 
+@app.route("/api/upload-resume-async", methods=["POST"])
+@token_required
+def upload_resume_async(current_user):
+    """Accept a resume and generate its question set in the background"""
+    if collections is None or collections['questions'] is None:
+        return jsonify({"error": "Database unavailable for resume upload"}), 503
+
+    try:
+        if 'file' not in request.files:
+            return jsonify({"error": "No file part"}), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({"error": "No selected file"}), 400
+
+        question_set_id = enqueue_question_set_job(file, current_user['_id'])
+        return jsonify({"question_set_id": question_set_id, "status": "pending"}), 202
+    except Exception as e:
+        print(f"Upload resume async error: {str(e)}")
+        return jsonify({"error": "Failed to queue resume processing"}), 500
+
+@app.route("/api/upload-resume-public-async", methods=["POST"])
+def upload_resume_public_async():
+    """Public variant of /api/upload-resume-async"""
+    if collections is None or collections['questions'] is None:
+        return jsonify({"error": "Feature not available in local mode"}), 503
+
+    try:
+        if 'file' not in request.files:
+            return jsonify({"error": "No file part"}), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({"error": "No selected file"}), 400
+
+        question_set_id = enqueue_question_set_job(file, "public_user")
+        return jsonify({"question_set_id": question_set_id, "status": "pending"}), 202
+    except Exception as e:
+        print(f"Upload resume public async error: {str(e)}")
+        return jsonify({"error": "Failed to queue resume processing"}), 500
+
+@app.route("/api/question-set/<question_set_id>/status", methods=["GET"])
+def question_set_status(question_set_id):
+    """Report job status and whatever results are available so far"""
+    if collections is None or collections['questions'] is None:
+        return jsonify({"error": "Database unavailable"}), 503
+
+    try:
+        question_set = collections['questions'].find_one(
+            {"_id": question_set_id},
+            {"status": 1, "questions": 1, "skills": 1, "expected_answers": 1, "error": 1,
+             "timestamp": 1, "updated_at": 1}
+        )
+        if not question_set:
+            return jsonify({"error": "Question set not found"}), 404
+
+        # The worker running the job died (crash, timeout or restart) before finishing it
+        if is_stale_job(question_set):
+            question_set["status"] = "failed"
+            question_set["error"] = "Processing was interrupted. Please upload again."
+            mark_question_sets_failed([question_set_id], question_set["error"])
+
+        # Question sets created by the synchronous endpoints have no status field
+        status = question_set.get("status", "completed")
+        response = {
+            "question_set_id": question_set_id,
+            "status": status,
+            "questions": question_set.get("questions", []),
+            "skills": question_set.get("skills", []),
+            "expected_answers_ready": status == "completed" and bool(question_set.get("expected_answers"))
+        }
+        if status == "failed":
+            response["error"] = question_set.get("error", "Failed to process resume")
+        return jsonify(response), 200
+    except Exception as e:
+        print(f"Question set status error: {str(e)}")
+        return jsonify({"error": "Failed to retrieve question set status"}), 500
+
+def sse_event(event, data):
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """Stream an event generator to the client without proxy buffering"""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def stream_question_set(user_id, text=None, source=None, filename=None, digest=None, source_type=None):
+    """Generate a question set, emitting each question and answer as it becomes available.
+
+    Takes either ``text`` or an upload's ``source`` and ``digest`` from
+    read_upload; a spooled upload is removed when the stream ends. Events: ``question_set`` (id), ``skills``, ``question`` (index, text),
+    ``expected_answer`` (index only; answer text is revealed on submission),
+    ``done`` and ``error``.
+    """
+    question_set_id = str(uuid.uuid4())
+    questions_collection = collections['questions']
+    record = {
+        "_id": question_set_id,
+        "user_id": user_id,
+        "status": "processing",
+        "questions": [],
+        "expected_answers": [],
+        "skills": [],
+        "timestamp": datetime.utcnow()
+    }
+    if source_type:
+        record["sourceType"] = source_type
+
+    try:
+        questions_collection.insert_one(record)
+        yield sse_event("question_set", {"question_set_id": question_set_id})
+
+        cache_key = resume_cache_key(digest, filename) if digest is not None else None
+        cached = resume_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            skills, questions = cached["skills"], cached["questions"]
+            expected_answers, expected_keywords = cached["expected_answers"], cached["expected_keywords"]
+            yield sse_event("skills", {"skills": skills})
+            for i, question in enumerate(questions):
+                yield sse_event("question", {"index": i, "question": question})
+        else:
+            if text is None:
+                text = extract_upload_text(source, filename)
+            skills = extract_info(text)["skills"]
+            yield sse_event("skills", {"skills": skills})
+
+            questions = []
+            for question in stream_questions(skills=skills, resume_text=text):
+                yield sse_event("question", {"index": len(questions), "question": question})
+                questions.append(question)
+            # Stored in the order streamed: the client already holds these indexes
+            questions_collection.update_one(
+                {"_id": question_set_id},
+                {"$set": {"status": "questions_ready", "skills": skills, "questions": questions,
+                          "updated_at": datetime.utcnow()}}
+            )
+
+            expected_answers = [None] * len(questions)
+            for i, answer in iter_expected_answers(questions, skills=skills, resume_text=text):
+                expected_answers[i] = answer
+                yield sse_event("expected_answer", {"index": i})
+            expected_keywords = extract_keywords_for_answers(expected_answers)
+
+            if cache_key and text.strip():
+                resume_cache.set(cache_key, {
+                    "text": text,
+                    "skills": skills,
+                    "questions": questions,
+                    "expected_answers": expected_answers,
+                    "expected_keywords": expected_keywords
+                })
+
+        questions_collection.update_one(
+            {"_id": question_set_id},
+            {"$set": {
+                "status": "completed",
+                "skills": skills,
+                "questions": questions,
+                "expected_answers": expected_answers,
+                "expected_keywords": expected_keywords
+            }}
+        )
+        yield sse_event("done", {"question_set_id": question_set_id, "question_count": len(questions)})
+    except GeneratorExit:
+        # The client disconnected; nothing more can be sent
+        print(f"DEBUG: Client left question set stream {question_set_id}")
+        try:
+            mark_question_sets_failed([question_set_id], "Generation stopped because the client disconnected")
+        except Exception as db_error:
+            print(f"ERROR: Failed to record stream failure: {str(db_error)}")
+        raise
+    except Exception as e:
+        print(f"ERROR: Streaming question set {question_set_id} failed: {str(e)}")
+        print(f"ERROR: Traceback: {traceback.format_exc()}")
+        try:
+            questions_collection.update_one(
+                {"_id": question_set_id},
+                {"$set": {"status": "failed", "error": "Failed to generate questions"}}
+            )
+        except Exception:
+            pass
+        yield sse_event("error", {"error": "Failed to generate questions"})
+    finally:
+        discard_upload(source)
+
+@app.route("/api/upload-resume-public-stream", methods=["POST"])
+def upload_resume_public_stream():
+    """Upload a resume and stream questions back over Server-Sent Events"""
+    if collections is None or collections['questions'] is None:
+        return jsonify({"error": "Feature not available in local mode"}), 503
+
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part"}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+
+    source, digest = read_upload(file, request.content_length)
+    return sse_response(stream_question_set("public_user", source=source, filename=file.filename, digest=digest))
+
+@app.route("/api/process-voice-public-stream", methods=["POST"])
+def process_voice_public_stream():
+    """Generate questions from a voice transcription and stream them over Server-Sent Events"""
+    if collections is None or collections['questions'] is None:
+        return jsonify({"error": "Voice processing not available in local mode"}), 503
+
+    data = request.json
+    if not data or 'transcription' not in data:
+        return jsonify({"error": "No transcription data provided"}), 400
+
+    return sse_response(stream_question_set("public_user", text=data['transcription'], source_type="voice"))
+
+def history_page_response(collection, query, default_limit, summary_projection, transform=None):
+    """Serve one newest-first page of a history listing.
+
+    Query parameters: ``limit`` (page size), ``cursor`` (from the previous
+    page's ``X-Next-Cursor`` header) and ``view`` (``summary`` omits heavy
+    fields, ``full`` returns whole documents). The body is a JSON array
+    serialized one document at a time.
+    """
+    limit = request.args.get('limit', default_limit, type=int)
+    if limit < 1 or limit > MAX_HISTORY_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_HISTORY_PAGE_SIZE}"}), 400
+    view = request.args.get('view', 'summary')
+    if view not in ('summary', 'full'):
+        return jsonify({"error": "view must be 'summary' or 'full'"}), 400
+
+    projection = summary_projection if view == 'summary' else None
+    try:
+        docs, next_cursor = fetch_page(collection, query, projection, request.args.get('cursor'), limit)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    response = Response(iter_json_array(docs, transform), mimetype="application/json")
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def public_history_entry(entry):
+    """Normalize a public question set for the history listing"""
+    # Ensure questions and skills are lists for consistent frontend handling
+    if 'questions' not in entry or not isinstance(entry['questions'], list):
+        entry['questions'] = []
+    if 'skills' not in entry or not isinstance(entry['skills'], list):
+        entry['skills'] = []
+    # Add a sourceType for the frontend to differentiate
+    entry['sourceType'] = 'public' # Or 'voice' if this endpoint is only for voice-generated
+    return entry
+
 @app.route("/api/question-history-public", methods=["GET"])
 def question_history_public():
     print(f"DEBUG: /api/question-history-public endpoint hit. Questions collection available: {collections and collections['questions'] is not None}")
@@ -415,24 +992,15 @@ def question_history_public():
         return jsonify({"error": "Question history not available in local mode"}), 503
     
     try:
-        # Fetch questions generated for the 'public_user'
-        history_entries = list(collections['questions'].find({"user_id": "public_user"}).sort("timestamp", -1))
-        
-        # Convert ObjectId and datetime objects to strings for JSON serialization
-        for entry in history_entries:
-            entry['_id'] = str(entry['_id'])
-            if 'timestamp' in entry and isinstance(entry['timestamp'], datetime):
-                entry['timestamp'] = entry['timestamp'].isoformat()
-            # Ensure questions and skills are lists for consistent frontend handling
-            if 'questions' not in entry or not isinstance(entry['questions'], list):
-                entry['questions'] = []
-            if 'skills' not in entry or not isinstance(entry['skills'], list):
-                entry['skills'] = []
-            # Add a sourceType for the frontend to differentiate
-            entry['sourceType'] = 'public' # Or 'voice' if this endpoint is only for voice-generated
-            
-        print(f"DEBUG: Fetched {len(history_entries)} public history entries.")
-        return jsonify(history_entries), 200
+        # Completed question sets generated for the 'public_user' (sets created
+        # before jobs had a status have none)
+        return history_page_response(
+            collections['questions'],
+            {"user_id": "public_user", "status": {"$in": ["completed", None]}},
+            default_limit=50,
+            summary_projection=QUESTION_SUMMARY_PROJECTION,
+            transform=public_history_entry
+        )
     except Exception as e:
         print(f"Error fetching public question history: {str(e)}")
         return jsonify({"error": "Failed to retrieve public question history"}), 500
@@ -454,6 +1022,7 @@ def process_voice_public():
         info = extract_info(transcription_text) # Assuming extract_info can work with raw text
         questions = generate_questions(skills=info["skills"], resume_text=transcription_text)
         expected_answers = generate_expected_answers(questions, skills=info["skills"], resume_text=transcription_text)
+        expected_keywords = extract_keywords_for_answers(expected_answers)
 
         question_set_id = str(uuid.uuid4())
         collections['questions'].insert_one({
@@ -461,6 +1030,7 @@ def process_voice_public():
             "user_id": "public_user", # Mark as public
             "questions": questions,
             "expected_answers": expected_answers,
+            "expected_keywords": expected_keywords,
             "skills": info["skills"],
             "timestamp": datetime.utcnow(),
             "sourceType": "voice" # Indicate source type
@@ -480,6 +1050,118 @@ def process_voice_public():
 # Continue with the rest of your endpoints...
 # (I've included the key fixes for the main issues)
 
+def build_answer_target(question_set, question_index, user_answer):
+    """Resolve one answer against an already-loaded question set.
+
+    Returns ``(target, None)`` on success or ``(None, (message, status))``.
+    """
+    if question_index is None or not user_answer:
+        return None, ("Missing data for answer submission", 400)
+    # bool is an int subclass; non-string answers would fail later in scoring
+    if isinstance(question_index, bool) or not isinstance(question_index, int) or not isinstance(user_answer, str):
+        return None, ("Invalid data for answer submission", 400)
+
+    if question_index < 0 or question_index >= len(question_set['questions']):
+        return None, ("Question index out of bounds", 400)
+
+    # Question sets created before keywords were precomputed have none stored
+    expected_keywords = question_set.get('expected_keywords') or []
+
+    return {
+        "question_set_id": question_set['_id'],
+        "question_index": question_index,
+        "question_text": question_set['questions'][question_index],
+        "user_answer": user_answer,
+        "expected_answer": question_set['expected_answers'][question_index],
+        "expected_keywords": expected_keywords[question_index] if question_index < len(expected_keywords) else None,
+        "answer_index": get_answer_index(question_set['_id'], question_set['expected_answers']),
+        "skills": question_set['skills'],
+        "question_set_owner": question_set.get('user_id')
+    }, None
+
+def load_question_set_for_answers(question_set_id):
+    """Fetch a question set that answers can be submitted against.
+
+    Returns ``(question_set, None)`` on success or ``(None, error_response)``.
+    """
+    if not question_set_id:
+        return None, (jsonify({"error": "Missing data for answer submission"}), 400)
+
+    question_set = collections['questions'].find_one({"_id": question_set_id})
+    if not question_set:
+        return None, (jsonify({"error": "Question set not found"}), 404)
+
+    if question_set.get('status', 'completed') != 'completed':
+        return None, (jsonify({"error": "Question set is still being generated"}), 409)
+
+    return question_set, None
+
+def load_answer_target(data):
+    """Validate an answer submission and look up the question it answers.
+
+    Returns ``(target, None)`` on success or ``(None, error_response)``.
+    """
+    if not data:
+        return None, (jsonify({"error": "Missing data for answer submission"}), 400)
+
+    question_index = data.get('question_index')
+    user_answer = data.get('answer')
+    if not all([data.get('question_set_id'), isinstance(question_index, int), user_answer]):
+        return None, (jsonify({"error": "Missing data for answer submission"}), 400)
+
+    question_set, error = load_question_set_for_answers(data.get('question_set_id'))
+    if error:
+        return None, error
+
+    target, problem = build_answer_target(question_set, question_index, user_answer)
+    if problem:
+        message, status = problem
+        return None, (jsonify({"error": message}), status)
+    return target, None
+
+def score_submission(target):
+    """Local TF-IDF/concept-coverage score for a validated submission"""
+    return score_answer(
+        target['user_answer'],
+        target['answer_index'],
+        target['question_index'],
+        target['expected_keywords']
+    )
+
+def evaluate_answer(target, include_feedback=True):
+    """Score an answer locally and, optionally, generate LLM feedback for it"""
+    # Local score is available instantly; the LLM narrative can be skipped
+    score = score_submission(target)
+
+    # Use AI to generate comprehensive feedback
+    ai_feedback = None
+    if include_feedback:
+        try:
+            print("DEBUG: Calling AI for feedback generation...")
+            ai_feedback = compare_and_provide_feedback(target['user_answer'], target['expected_answer'], target['expected_keywords'])
+            print(f"DEBUG: AI feedback generated successfully: {ai_feedback[:100]}...")
+        except Exception as ai_error:
+            print(f"ERROR: AI feedback generation failed: {str(ai_error)}")
+            # Fallback to simple feedback
+            ai_feedback = "Your answer has been recorded. Consider reviewing the expected answer to identify areas for improvement."
+    return ai_feedback, score
+
+def build_answer_record(target, ai_feedback, score=None, user_id="public_user"):
+    """Document stored in user_answers for an evaluated answer"""
+    return {
+        "user_id": user_id,
+        "question_set_owner": target.get('question_set_owner'),
+        "question_set_id": target['question_set_id'],
+        "question_index": target['question_index'],
+        "question_text": target['question_text'],
+        "user_answer": target['user_answer'],
+        "ai_feedback": ai_feedback,
+        "score": score,
+        "expected_answer": target['expected_answer'],
+        "skills": target['skills'],
+        "timestamp": datetime.utcnow()
+    }
+
 @app.route("/api/submit-answer", methods=["POST"])
 def submit_answer():
     print(f"DEBUG: /api/submit-answer endpoint hit. User answers collection available: {collections and collections['user_answers'] is not None}")
@@ -488,47 +1170,20 @@ def submit_answer():
 
     try:
         data = request.json
-        question_set_id = data.get('question_set_id')
-        question_index = data.get('question_index')
-        user_answer = data.get('answer')
+        target, error = load_answer_target(data)
+        if error:
+            return error
 
-        if not all([question_set_id, isinstance(question_index, int), user_answer]):
-            return jsonify({"error": "Missing data for answer submission"}), 400
-
-        question_set = collections['questions'].find_one({"_id": question_set_id})
-        if not question_set:
-            return jsonify({"error": "Question set not found"}), 404
+        question_set_id = target['question_set_id']
+        question_index = target['question_index']
+        expected_answer = target['expected_answer']
 
-        if question_index >= len(question_set['questions']):
-            return jsonify({"error": "Question index out of bounds"}), 400
+        print(f"DEBUG: Processing answer for question: {target['question_text'][:50]}...")
 
-        question_text = question_set['questions'][question_index]
-        expected_answer = question_set['expected_answers'][question_index]
-        skills = question_set['skills']
-
-        print(f"DEBUG: Processing answer for question: {question_text[:50]}...")
-        
-        # Use AI to generate comprehensive feedback
-        try:
-            print("DEBUG: Calling AI for feedback generation...")
-            ai_feedback = compare_and_provide_feedback(user_answer, expected_answer)
-            print(f"DEBUG: AI feedback generated successfully: {ai_feedback[:100]}...")
-        except Exception as ai_error:
-            print(f"ERROR: AI feedback generation failed: {str(ai_error)}")
-            # Fallback to simple feedback
-            ai_feedback = "Your answer has been recorded. Consider reviewing the expected answer to identify areas for improvement."
+        ai_feedback, score = evaluate_answer(target, data.get('include_feedback', True))
 
         # Store the user's answer and AI feedback
-        answer_record = {
-            "question_set_id": question_set_id,
-            "question_index": question_index,
-            "question_text": question_text,
-            "user_answer": user_answer,
-            "ai_feedback": ai_feedback,
-            "expected_answer": expected_answer,
-            "skills": skills,
-            "timestamp": datetime.utcnow()
-        }
+        answer_record = build_answer_record(target, ai_feedback, score, get_optional_user_id())
         
         try:
             collections['user_answers'].insert_one(answer_record)
@@ -541,6 +1196,7 @@ def submit_answer():
         
         return jsonify({
             "feedback": ai_feedback,
+            "score": score,
             "expected_answer": expected_answer,
             "message": "Answer submitted successfully"
         }), 200
@@ -551,6 +1207,120 @@ def submit_answer():
         return jsonify({"error": "Failed to submit answer"}), 500
 
 
+@app.route("/api/submit-answers-batch", methods=["POST"])
+def submit_answers_batch():
+    """Evaluate all answers for a question set in one request.
+
+    Expects ``{"question_set_id": ..., "answers": [{"question_index": 0, "answer": "..."}, ...]}``
+    and returns per-answer feedback in the order submitted.
+    """
+    if collections is None or collections['user_answers'] is None or collections['questions'] is None:
+        return jsonify({"error": "Database unavailable for answer submission"}), 503
+
+    try:
+        data = request.json or {}
+        answers = data.get('answers')
+        if not isinstance(answers, list) or not answers:
+            return jsonify({"error": "Missing data for answer submission"}), 400
+        if len(answers) > MAX_BATCH_ANSWERS:
+            return jsonify({"error": f"At most {MAX_BATCH_ANSWERS} answers per batch"}), 400
+
+        question_set, error = load_question_set_for_answers(data.get('question_set_id'))
+        if error:
+            return error
+
+        results = [None] * len(answers)
+        targets = []
+        for i, item in enumerate(answers):
+            item = item if isinstance(item, dict) else {}
+            target, problem = build_answer_target(question_set, item.get('question_index'), item.get('answer'))
+            if problem:
+                results[i] = {"question_index": item.get('question_index'), "error": problem[0]}
+            else:
+                targets.append((i, target))
+
+        include_feedback = data.get('include_feedback', True)
+        user_id = get_optional_user_id()
+        records = []
+        if targets:
+            workers = max(1, min(BATCH_FEEDBACK_WORKERS, len(targets)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                evaluations = executor.map(lambda t: evaluate_answer(t[1], include_feedback), targets)
+                for (i, target), (ai_feedback, score) in zip(targets, evaluations):
+                    records.append(build_answer_record(target, ai_feedback, score, user_id))
+                    results[i] = {
+                        "question_index": target['question_index'],
+                        "feedback": ai_feedback,
+                        "score": score,
+                        "expected_answer": target['expected_answer']
+                    }
+
+        if records:
+            try:
+                collections['user_answers'].insert_many(records, ordered=False)
+            except Exception as db_error:
+                print(f"ERROR: Failed to save answer records: {str(db_error)}")
+
+        print(f"DEBUG: Batch of {len(answers)} answers evaluated for question set {question_set['_id']}")
+        return jsonify({
+            "question_set_id": question_set['_id'],
+            "results": results,
+            "message": "Answers submitted successfully"
+        }), 200
+
+    except Exception as e:
+        print(f"ERROR: Submit answers batch failed: {str(e)}")
+        print(f"ERROR: Traceback: {traceback.format_exc()}")
+        return jsonify({"error": "Failed to submit answers"}), 500
+
+
+@app.route("/api/submit-answer-stream", methods=["POST"])
+def submit_answer_stream():
+    """Submit an answer and stream AI feedback tokens over Server-Sent Events"""
+    if collections is None or collections['user_answers'] is None or collections['questions'] is None:
+        return jsonify({"error": "Database unavailable for answer submission"}), 503
+
+    try:
+        target, error = load_answer_target(request.json)
+        if error:
+            return error
+        # Resolved here: the cookie is not reachable once the response starts streaming
+        user_id = get_optional_user_id()
+    except Exception as e:
+        print(f"ERROR: Submit answer stream failed: {str(e)}")
+        return jsonify({"error": "Failed to submit answer"}), 500
+
+    def events():
+        score = score_submission(target)
+        yield sse_event("score", score)
+
+        parts = []
+        try:
+            for text in stream_feedback(target['user_answer'], target['expected_answer'], target['expected_keywords']):
+                parts.append(text)
+                yield sse_event("feedback", {"delta": text})
+        except FeedbackStreamInterrupted as e:
+            # Partial feedback is not saved as if the answer had been fully evaluated
+            print(f"ERROR: Feedback stream interrupted: {str(e)}")
+            yield sse_event("error", {"error": "Feedback generation was interrupted. Please resubmit.", "score": score})
+            return
+
+        ai_feedback = "".join(parts).strip()
+        try:
+            collections['user_answers'].insert_one(build_answer_record(target, ai_feedback, score, user_id))
+        except Exception as db_error:
+            print(f"ERROR: Failed to save answer record: {str(db_error)}")
+
+        yield sse_event("done", {
+            "feedback": ai_feedback,
+            "score": score,
+            "expected_answer": target['expected_answer'],
+            "message": "Answer submitted successfully"
+        })
+
+    return sse_response(events())
+
+
 @app.route("/api/answer-history", methods=["GET"])
 @token_required
 def get_answer_history(current_user):
@@ -560,24 +1330,38 @@ def get_answer_history(current_user):
         return jsonify({"error": "Answer history not available in local mode"}), 503
     
     try:
-        # Get all answers for this user (you might need to modify this based on how you track users)
-        # For now, we'll get recent answers - you may want to add user tracking
-        answer_history = list(collections['user_answers'].find().sort("timestamp", -1).limit(20))
-        
-        # Convert ObjectId and datetime objects for JSON serialization
-        for record in answer_history:
-            record['_id'] = str(record['_id'])
-            if 'timestamp' in record and isinstance(record['timestamp'], datetime):
-                record['timestamp'] = record['timestamp'].isoformat()
-        
-        print(f"DEBUG: Retrieved {len(answer_history)} answer records")
-        return jsonify(answer_history), 200
+        return history_page_response(
+            collections['user_answers'],
+            {"user_id": current_user['_id']},
+            default_limit=20,
+            summary_projection=ANSWER_SUMMARY_PROJECTION
+        )
     
     except Exception as e:
         print(f"ERROR: Failed to retrieve answer history: {str(e)}")
         return jsonify({"error": "Failed to retrieve answer history"}), 500
 
 
+@app.route("/api/answer-progress", methods=["GET"])
+@token_required
+def get_answer_progress(current_user):
+    """Per-question-set progress and scores for the current user, newest activity first"""
+    if collections is None or collections['user_answers'] is None:
+        return jsonify({"error": "Answer progress not available in local mode"}), 503
+
+    try:
+        pipeline = answer_progress_pipeline(current_user['_id'], collections['questions'].name)
+        progress = list(collections['user_answers'].aggregate(pipeline))
+        for entry in progress:
+            if entry.get('last_answered'):
+                entry['last_answered'] = entry['last_answered'].isoformat()
+        return jsonify(progress), 200
+
+    except Exception as e:
+        print(f"ERROR: Failed to compute answer progress: {str(e)}")
+        return jsonify({"error": "Failed to retrieve answer progress"}), 500
+
+
 @app.route("/api/answer-history-public", methods=["GET"])
 def get_answer_history_public():
     """Get recent public answer submissions with AI feedback"""
@@ -586,17 +1370,13 @@ def get_answer_history_public():
         return jsonify({"error": "Answer history not available in local mode"}), 503
     
     try:
-        # Get recent public answers
-        answer_history = list(collections['user_answers'].find().sort("timestamp", -1).limit(10))
-        
-        # Convert ObjectId and datetime objects for JSON serialization
-        for record in answer_history:
-            record['_id'] = str(record['_id'])
-            if 'timestamp' in record and isinstance(record['timestamp'], datetime):
-                record['timestamp'] = record['timestamp'].isoformat()
-        
-        print(f"DEBUG: Retrieved {len(answer_history)} public answer records")
-        return jsonify(answer_history), 200
+        # Answers saved before ownership was recorded have no user_id
+        return history_page_response(
+            collections['user_answers'],
+            {"user_id": {"$in": ["public_user", None]}},
+            default_limit=10,
+            summary_projection=ANSWER_SUMMARY_PROJECTION
+        )
     
     except Exception as e:
         print(f"ERROR: Failed to retrieve public answer history: {str(e)}")
@@ -627,6 +1407,18 @@ def test_ai_feedback():
         return jsonify({"error": f"AI feedback test failed: {str(e)}"}), 500
     
 
+@app.before_request
+def reject_oversized_body():
+    """Refuse declared bodies over MAX_CONTENT_LENGTH before any route reads them"""
+    limit = app.config.get("MAX_CONTENT_LENGTH")
+    if limit and request.content_length is not None and request.content_length > limit:
+        return jsonify({"error": f"Upload too large (limit {limit // (1024 * 1024)} MB)"}), 413
+
+@app.errorhandler(RequestEntityTooLarge)
+def too_large(error):
+    limit = app.config.get("MAX_CONTENT_LENGTH") or 0
+    return jsonify({"error": f"Upload too large (limit {limit // (1024 * 1024)} MB)"}), 413
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"error": "Endpoint not found"}), 404
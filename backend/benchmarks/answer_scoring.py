@@ -0,0 +1,74 @@
+"""Answers per second: local TF-IDF scoring versus LLM feedback, against the stub LLM.
+
+Usage (from backend/):
+
+    python -m benchmarks.answer_scoring [--answers 200] [--latency 0.5] [--workers 4]
+
+Local scoring runs on one thread. The LLM path calls compare_and_provide_feedback
+from ``--workers`` threads, as /api/submit-answers-batch does; each answer is
+distinct, so the completion cache never serves it.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_llm import start_stub_llm
+
+TOPICS = ["database indexes", "HTTP caching", "message queues", "container images", "load balancing",
+          "connection pooling", "rate limiting", "schema migrations", "feature flags", "log aggregation"]
+
+
+def _corpus(count):
+    expected = [f"Explain {topic}: describe the trade-offs, when to use {topic}, how to monitor it "
+                f"and a production incident where {topic} mattered" for topic in TOPICS]
+    answers = [(i % len(TOPICS), f"Answer {i}: I used {TOPICS[i % len(TOPICS)]} to cut latency and "
+                                 f"monitored it with dashboards and alerts") for i in range(count)]
+    return expected, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local scoring vs LLM feedback throughput")
+    parser.add_argument("--answers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub seconds per completion")
+    parser.add_argument("--workers", type=int, default=4, help="threads for the LLM path")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_llm(args.latency)
+    # The transport reads its settings at import, so point it at the stub first
+    os.environ["LLM_BASE_URL"] = base_url
+    from utils.answer_evaluator import compare_and_provide_feedback, extract_keywords_for_answers
+    from utils.scoring import build_answer_index, score_answer
+    from utils import resources
+
+    expected, answers = _corpus(args.answers)
+    keywords = extract_keywords_for_answers(expected)
+    try:
+        resources.get("stopwords")
+        resources.llm_client()  # setup is not part of either measurement
+
+        started = time.perf_counter()
+        index = build_answer_index(expected)
+        for question_index, answer in answers:
+            score_answer(answer, index, question_index, keywords[question_index])
+        local_rate = len(answers) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(
+                lambda item: compare_and_provide_feedback(item[1], expected[item[0]], keywords[item[0]]),
+                answers
+            ))
+        llm_rate = len(answers) / (time.perf_counter() - started)
+        assert server.stats["requests"] >= len(answers)
+
+        print(f"{len(answers)} answers, {args.latency}s stub latency, {args.workers} LLM workers")
+        print(f"local scoring: {local_rate:>10.1f} answers/s")
+        print(f"LLM feedback:  {llm_rate:>10.1f} answers/s (ceiling {args.workers / args.latency:.1f})")
+        print(f"local is {local_rate / llm_rate:.0f}x faster")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""How generate_expected_answers scales with worker threads, against the stub LLM.
+
+Usage (from backend/):
+
+    python -m benchmarks.expected_answers [--questions 12] [--max-workers 8] [--latency 0.3]
+
+Every completion takes ``--latency`` seconds, so with W workers the ideal time
+is ceil(questions / W) * latency; the gap to it is our own overhead.
+"""
+import argparse
+import math
+import os
+import time
+
+from benchmarks.stub_llm import start_stub_llm
+
+SKILLS = ["Python", "Flask", "MongoDB", "Docker", "AWS"]
+RESUME_TEXT = """Experience
+Senior Software Engineer at Acme Corp
+Built Flask services on MongoDB and shipped them to AWS with Docker.
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker scaling of generate_expected_answers")
+    parser.add_argument("--questions", type=int, default=12)
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub seconds per completion")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_llm(args.latency)
+    # The transport reads its settings at import, so point it at the stub first
+    os.environ["LLM_BASE_URL"] = base_url
+    os.environ["LLM_POOL_SIZE"] = str(max(args.max_workers, int(os.getenv("LLM_POOL_SIZE", "20"))))
+    from utils.question_generator import generate_expected_answers
+    from utils import resources
+
+    questions = [f"Question {i + 1}: how would you scale a {SKILLS[i % len(SKILLS)]} service?"
+                 for i in range(args.questions)]
+    try:
+        resources.llm_client()  # connection pool setup is not part of the measurement
+        print(f"{args.questions} questions, {args.latency}s stub latency")
+        print(f"{'workers':>7} {'seconds':>8} {'ideal':>7} {'speedup':>8} {'peak in flight':>15}")
+        baseline = None
+        for workers in range(1, args.max_workers + 1):
+            server.stats["max_in_flight"] = 0
+            started = time.perf_counter()
+            answers = generate_expected_answers(questions, skills=SKILLS, resume_text=RESUME_TEXT,
+                                                max_workers=workers, mode="parallel")
+            elapsed = time.perf_counter() - started
+            assert len(answers) == len(questions) and all(answers)
+            baseline = baseline or elapsed
+            ideal = math.ceil(args.questions / workers) * args.latency
+            print(f"{workers:>7} {elapsed:>8.2f} {ideal:>7.2f} {baseline / elapsed:>7.2f}x "
+                  f"{server.stats['max_in_flight']:>15}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
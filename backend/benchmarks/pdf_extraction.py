@@ -0,0 +1,111 @@
+"""Time and peak RSS of resume text extraction, serial versus the PDF process pool.
+
+Usage (from backend/):
+
+    python -m benchmarks.pdf_extraction [resume.pdf ...] [--repeat 3] [--pages 200]
+
+Defaults to the PDFs in uploads/. Each corpus file is also concatenated into a
+single document of at least ``--pages`` pages, so the pool path is exercised.
+Every mode runs in a fresh interpreter so its peak RSS is its own; the pool's
+worker processes are reported separately as "children".
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    # Pool disabled: every page is read in the request process
+    "serial": {"PDF_PARALLEL_PAGE_THRESHOLD": "1000000000"},
+    "pool": {"PDF_PARALLEL_PAGE_THRESHOLD": "50", "PDF_PROCESS_WORKERS": "2"},
+}
+
+
+def _peak_rss_mb(who):
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def build_long_pdf(paths, min_pages):
+    """Concatenate ``paths`` until the document has ``min_pages`` pages; returns its path"""
+    import fitz
+    out = fitz.open()
+    while out.page_count < min_pages:
+        for path in paths:
+            with fitz.open(path) as doc:
+                out.insert_pdf(doc)
+    fd, long_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    out.save(long_path)
+    out.close()
+    return long_path
+
+
+def run_mode(paths, repeat, as_bytes):
+    """Extract every file ``repeat`` times in this process and print a JSON summary"""
+    from utils.extractor import extract_text
+    sources = []
+    for path in paths:
+        if as_bytes:
+            with open(path, "rb") as f:
+                sources.append((f.read(), os.path.basename(path)))
+        else:
+            sources.append((path, None))
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chars = sum(len(extract_text(source, filename=name)) for source, name in sources)
+        timings.append(time.perf_counter() - started)
+    print(json.dumps({
+        "best_s": min(timings),
+        "mean_s": sum(timings) / len(timings),
+        "chars": chars,
+        "rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        "children_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=200, help="page count of the synthetic long PDF")
+    parser.add_argument("--bytes", action="store_true", help="pass file contents instead of paths, as uploads do")
+    parser.add_argument("--mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.paths, args.repeat, args.bytes)
+        return
+
+    paths = args.paths or sorted(glob.glob(os.path.join("uploads", "*.pdf")))
+    if not paths:
+        parser.error("no PDFs given and none found in uploads/")
+    long_pdf = build_long_pdf(paths, args.pages)
+    try:
+        corpus = paths + [long_pdf]
+        print(f"{len(paths)} resumes + 1 synthetic {args.pages}+ page PDF, {args.repeat} runs, "
+              f"{'bytes' if args.bytes else 'paths'}")
+        print(f"{'mode':<8} {'best s':>8} {'mean s':>8} {'RSS MB':>8} {'children MB':>12}")
+        for mode, env in MODES.items():
+            cmd = [sys.executable, "-m", "benchmarks.pdf_extraction", "--mode", mode,
+                   "--repeat", str(args.repeat)] + (["--bytes"] if args.bytes else []) + corpus
+            # No character budget, so the long PDF is read to the end in both modes
+            env = {**os.environ, "EXTRACT_MAX_CHARS": "0", **env}
+            output = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<8} {result['best_s']:>8.3f} {result['mean_s']:>8.3f} "
+                  f"{result['rss_mb']:>8.1f} {result['children_rss_mb']:>12.1f}")
+    finally:
+        os.remove(long_pdf)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Per-request overhead of token_required with and without the session cache.
+
+Usage (from backend/):
+
+    python -m benchmarks.session_auth [--requests 5000] [--db-latency 0.001]
+
+"uncached" clears session_cache before every request, which is what each
+request cost before sessions were cached: a JWT decode plus a users lookup.
+The users collection is an in-memory stand-in that sleeps ``--db-latency``
+seconds per lookup to model the MongoDB round trip.
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DEFER_MONGO_CONNECT", "1")
+os.environ.setdefault("RESOURCE_WARMUP", "off")
+
+
+class _Users:
+    def __init__(self, user, latency):
+        self.user = user
+        self.latency = latency
+
+    def find_one(self, query, projection=None):
+        time.sleep(self.latency)
+        return dict(self.user) if query.get("_id") == self.user["_id"] else None
+
+
+def _run(app, handler, token, count, cached):
+    app.session_cache.clear()
+    with app.app.test_request_context("/api/profile", headers={"Cookie": f"token={token}"}):
+        started = time.perf_counter()
+        for _ in range(count):
+            if not cached:
+                app.session_cache.clear()
+            handler()
+        return (time.perf_counter() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="token_required overhead, cached vs uncached")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--db-latency", type=float, default=0.001, help="seconds per users lookup")
+    args = parser.parse_args()
+
+    import jwt
+    import app
+
+    user = {"_id": "bench-user", "username": "bench", "email": "bench@example.com"}
+    app.collections = {"users": _Users(user, args.db_latency), "questions": None, "user_answers": None}
+    token = jwt.encode({"user_id": user["_id"], "exp": int(time.time()) + 3600},
+                       app.JWT_SECRET, algorithm=app.JWT_ALGORITHM)
+    handler = app.token_required(lambda current_user: current_user["_id"])
+
+    uncached = _run(app, handler, token, args.requests, cached=False)
+    cached = _run(app, handler, token, args.requests, cached=True)
+    print(f"{args.requests} requests, {args.db_latency * 1000:.1f}ms per users lookup")
+    print(f"uncached: {uncached * 1e6:>9.1f} us/request")
+    print(f"cached:   {cached * 1e6:>9.1f} us/request ({uncached / cached:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
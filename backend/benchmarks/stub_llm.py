@@ -0,0 +1,127 @@
+"""Stand-in for the OpenAI-compatible chat completions API, for benchmarks.
+
+Answers ``POST /v1/chat/completions`` after a fixed delay, optionally streamed
+as Server-Sent Events, so benchmarks measure our concurrency rather than the
+provider's. Point the app at it with LLM_BASE_URL:
+
+    python -m benchmarks.stub_llm --port 8089 --latency 0.5
+    LLM_BASE_URL=http://127.0.0.1:8089/v1 python app.py
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = ("A good answer names the trade-off, explains when each option applies "
+                 "and backs it with a concrete example from production experience.")
+# The batched expected-answer prompt asks for "a JSON array of N strings"
+JSON_ARRAY_RE = re.compile(r"JSON array of (\d+) strings")
+
+
+def default_reply(messages):
+    """Reply text for ``messages``; a JSON array when the prompt asks for one"""
+    prompt = messages[-1].get("content", "") if messages else ""
+    match = JSON_ARRAY_RE.search(prompt)
+    if match:
+        return json.dumps([DEFAULT_REPLY] * int(match.group(1)))
+    return DEFAULT_REPLY
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        server = self.server
+        with server.stats_lock:
+            server.stats["requests"] += 1
+            server.stats["in_flight"] += 1
+            server.stats["max_in_flight"] = max(server.stats["max_in_flight"], server.stats["in_flight"])
+        try:
+            time.sleep(server.latency)
+            content = server.reply(body.get("messages") or [])
+            if body.get("stream"):
+                self._stream(body, content)
+            else:
+                self._respond(body, content)
+        finally:
+            with server.stats_lock:
+                server.stats["in_flight"] -= 1
+
+    def _respond(self, body, content):
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(json.dumps(body.get("messages"))) // 4,
+                      "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(json.dumps(body.get("messages"))) + len(content)) // 4}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, body, content):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_stub_llm(latency=0.2, reply=default_reply, host="127.0.0.1", port=0):
+    """Serve the stub in a background thread; returns ``(server, base_url)``.
+
+    ``server.stats`` counts requests and the peak number served concurrently.
+    Call ``server.shutdown()`` when done.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.reply = reply
+    server.stats_lock = threading.Lock()
+    server.stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fixed-latency stub LLM API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before each reply")
+    args = parser.parse_args()
+    server, base_url = start_stub_llm(args.latency, host=args.host, port=args.port)
+    print(f"Stub LLM on {base_url} ({args.latency}s per request); Ctrl-C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
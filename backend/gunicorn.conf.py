@@ -0,0 +1,25 @@
+import os
+
+# Read before app.py is imported: connect to MongoDB per worker and warm up
+# heavy resources in the master so forked workers share them copy-on-write
+os.environ.setdefault("DEFER_MONGO_CONNECT", "1")
+os.environ.setdefault("RESOURCE_WARMUP", "preload")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# Threaded workers keep serving other routes while a request waits on bcrypt
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = 120
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers are forked"""
+    from utils import resources
+    resources.warm_up(background=False)
+
+
+def post_fork(server, worker):
+    """Give each worker its own MongoDB connection pool"""
+    import app
+    app.connect_to_mongodb()
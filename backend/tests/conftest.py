@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    """The Flask app module, imported without connecting to MongoDB or warming up models"""
+    pytest.importorskip("flask")
+    pytest.importorskip("pymongo")
+    os.environ.setdefault("DEFER_MONGO_CONNECT", "1")
+    os.environ.setdefault("RESOURCE_WARMUP", "off")
+    # Cheap hashes; the cost factor is not what these tests measure
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    try:
+        import app
+    except ImportError as e:
+        pytest.skip(f"app dependencies not installed: {e}")
+    return app
@@ -0,0 +1,114 @@
+"""In-memory stand-ins for the pymongo collections the app uses"""
+import copy
+import threading
+
+
+_OPERATORS = {
+    "$in": lambda value, arg: value in arg,
+    "$lt": lambda value, arg: value is not None and value < arg,
+    "$lte": lambda value, arg: value is not None and value <= arg,
+}
+
+
+def _matches(doc, query):
+    for key, expected in query.items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in expected):
+                return False
+        elif key == "$and":
+            if not all(_matches(doc, clause) for clause in expected):
+                return False
+        elif isinstance(expected, dict) and expected and set(expected) <= set(_OPERATORS):
+            if not all(_OPERATORS[op](doc.get(key), arg) for op, arg in expected.items()):
+                return False
+        elif doc.get(key) != expected:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    doc = copy.deepcopy(doc)
+    for key, include in (projection or {}).items():
+        if not include:
+            doc.pop(key, None)
+    return doc
+
+
+class FakeCursor:
+    """sort/limit over the documents a FakeCollection.find matched"""
+
+    def __init__(self, docs, projection=None):
+        self.docs = docs
+        self.projection = projection
+
+    def sort(self, keys):
+        # Stable sorts applied from the last key to the first
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    def __iter__(self):
+        # Like MongoDB, sort on the full documents and project the results
+        return (_project(doc, self.projection) for doc in self.docs)
+
+
+class FakeCollection:
+    """Subset of a pymongo Collection (equality, $in/$lt/$lte, $and/$or), safe to share across threads"""
+
+    def __init__(self, docs=()):
+        self.docs = [copy.deepcopy(d) for d in docs]
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def find_one(self, query=None, projection=None):
+        with self._lock:
+            self._count("find_one")
+            for doc in self.docs:
+                if _matches(doc, query or {}):
+                    return _project(doc, projection)
+        return None
+
+    def find(self, query=None, projection=None):
+        with self._lock:
+            self._count("find")
+            return FakeCursor([copy.deepcopy(doc) for doc in self.docs if _matches(doc, query or {})], projection)
+
+    def insert_one(self, doc):
+        with self._lock:
+            self._count("insert_one")
+            self.docs.append(copy.deepcopy(doc))
+
+    def insert_many(self, docs, ordered=True):
+        with self._lock:
+            self._count("insert_many")
+            self.docs.extend(copy.deepcopy(d) for d in docs)
+
+    def update_one(self, query, update):
+        with self._lock:
+            self._count("update_one")
+            for doc in self.docs:
+                if _matches(doc, query):
+                    doc.update(copy.deepcopy(update.get("$set", {})))
+                    return
+
+    def update_many(self, query, update):
+        with self._lock:
+            self._count("update_many")
+            for doc in self.docs:
+                if _matches(doc, query):
+                    doc.update(copy.deepcopy(update.get("$set", {})))
+
+    def delete_one(self, query):
+        with self._lock:
+            self._count("delete_one")
+            for i, doc in enumerate(self.docs):
+                if _matches(doc, query):
+                    del self.docs[i]
+                    return
@@ -0,0 +1,103 @@
+import types
+import uuid
+
+import pytest
+
+pytest.importorskip("nltk")
+
+from utils import answer_evaluator, resources
+from utils.answer_evaluator import FeedbackStreamInterrupted, _fallback_feedback, stream_feedback
+
+EXPECTED = "Use an index on the filtered column to avoid a full table scan"
+KEYWORDS = ["index", "full table scan"]
+
+
+def _chunk(text):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=text))])
+
+
+class _FakeClient:
+    """OpenAI-style client whose streamed completion is the given chunks (or an exception)"""
+
+    def __init__(self, *chunks):
+        self.chunks = chunks
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        for chunk in self.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield _chunk(chunk)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def install(*chunks):
+        fake = _FakeClient(*chunks)
+        monkeypatch.setattr(resources, "llm_client", lambda: fake)
+        return fake
+    return install
+
+
+def _answer():
+    # A fresh answer per test keeps the memoized completions apart
+    return f"I would add an index ({uuid.uuid4()})"
+
+
+def test_empty_completion_streams_the_fallback(client):
+    client("", "   ")
+    answer = _answer()
+    assert "".join(stream_feedback(answer, EXPECTED, KEYWORDS)) == _fallback_feedback(answer, EXPECTED, KEYWORDS)
+
+
+def test_only_generic_phrases_streams_the_fallback(client):
+    client("Your answer has been ", "recorded. ", "Consider reviewing.")
+    answer = _answer()
+    assert "".join(stream_feedback(answer, EXPECTED, KEYWORDS)) == _fallback_feedback(answer, EXPECTED, KEYWORDS)
+
+
+def test_failure_before_any_text_streams_the_fallback(client):
+    client(RuntimeError("connection reset"))
+    answer = _answer()
+    assert list(stream_feedback(answer, EXPECTED, KEYWORDS)) == [_fallback_feedback(answer, EXPECTED, KEYWORDS)]
+
+
+def test_failure_after_text_is_reported(client):
+    client("You explained the index well but did not mention " * 3, RuntimeError("connection reset"))
+    parts = []
+    with pytest.raises(FeedbackStreamInterrupted):
+        for text in stream_feedback(_answer(), EXPECTED, KEYWORDS):
+            parts.append(text)
+    assert parts
+
+
+def test_streamed_text_matches_non_streaming_feedback(client, monkeypatch):
+    client("Good use of an index. ", "Consider reviewing ", "scan costs as well.")
+    answer = _answer()
+    streamed = "".join(stream_feedback(answer, EXPECTED, KEYWORDS))
+    assert streamed == "Good use of an index. scan costs as well."
+    assert answer_evaluator.compare_and_provide_feedback(answer, EXPECTED, KEYWORDS) == streamed
+
+
+def test_blank_completions_are_not_cached(client):
+    answer = _answer()
+    first = client("  ")
+    list(stream_feedback(answer, EXPECTED, KEYWORDS))
+    second = client("Mention the index type.")
+    assert "".join(stream_feedback(answer, EXPECTED, KEYWORDS)) == "Mention the index type."
+    assert first.calls == 1 and second.calls == 1
+    # Now memoized: the client is not called again
+    assert answer_evaluator.compare_and_provide_feedback(answer, EXPECTED, KEYWORDS) == "Mention the index type."
+    assert second.calls == 1
+
+
+def test_blank_cached_value_is_a_miss(client):
+    answer = _answer()
+    messages = answer_evaluator._feedback_messages(answer, EXPECTED)
+    key = answer_evaluator.completion_cache_key("mistralai/Mixtral-8x7B-Instruct-v0.1", messages, 0.3, 200)
+    answer_evaluator.llm_cache.set(key, " ")
+    fake = client("Explain when the index is not used.")
+    assert "".join(stream_feedback(answer, EXPECTED, KEYWORDS)) == "Explain when the index is not used."
+    assert fake.calls == 1
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from tests.fakes import FakeCollection
+
+FEEDBACK_LATENCY = 0.05  # seconds per stubbed LLM feedback call
+ANSWER_COUNT = 8
+QUESTION_SET = {
+    "_id": "qs-1",
+    "user_id": "public_user",
+    "status": "completed",
+    "questions": [f"How would you tune query {i}?" for i in range(ANSWER_COUNT)],
+    "expected_answers": [f"Add an index for query {i} and check the plan for a full table scan" for i in range(ANSWER_COUNT)],
+    "expected_keywords": [["index", "full table scan"]] * ANSWER_COUNT,
+    "skills": ["MongoDB"],
+}
+
+
+@pytest.fixture
+def api(app_module, monkeypatch):
+    """Test client over fake collections, with LLM feedback stubbed at a fixed latency"""
+    def fake_feedback(user_answer, expected_answer, expected_keywords=None):
+        time.sleep(FEEDBACK_LATENCY)
+        return "Mention the index type."
+
+    collections = {
+        "users": FakeCollection(),
+        "questions": FakeCollection([QUESTION_SET]),
+        "user_answers": FakeCollection(),
+    }
+    monkeypatch.setattr(app_module, "collections", collections)
+    monkeypatch.setattr(app_module, "compare_and_provide_feedback", fake_feedback)
+    client = app_module.app.test_client()
+    client.collections = collections
+    return client
+
+
+def _answers():
+    return [{"question_index": i, "answer": f"I would add an index for query {i}"} for i in range(ANSWER_COUNT)]
+
+
+def test_batch_outperforms_per_answer_requests(api, app_module):
+    rounds = 3
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for item in _answers():
+            response = api.post("/api/submit-answer", json=dict(item, question_set_id="qs-1"))
+            assert response.status_code == 200
+    single_rate = rounds * ANSWER_COUNT / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        response = api.post("/api/submit-answers-batch", json={"question_set_id": "qs-1", "answers": _answers()})
+        assert response.status_code == 200
+    batch_rate = rounds * ANSWER_COUNT / (time.perf_counter() - started)
+
+    print(f"per-answer: {single_rate:.1f} answers/s, batch: {batch_rate:.1f} answers/s")
+    # Feedback calls run on BATCH_FEEDBACK_WORKERS threads instead of one after another
+    workers = min(app_module.BATCH_FEEDBACK_WORKERS, ANSWER_COUNT)
+    assert batch_rate > single_rate * max(1.5, workers / 2)
+    assert api.collections["user_answers"].calls["insert_many"] == rounds
+
+
+def test_invalid_item_gets_its_own_error(api):
+    answers = _answers()[:3]
+    answers[1] = {"question_index": 1, "answer": 42}
+    answers.append({"question_index": True, "answer": "boolean index"})
+    answers.append("not an object")
+
+    response = api.post("/api/submit-answers-batch", json={"question_set_id": "qs-1", "answers": answers})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r.get("error") for r in results] == [
+        None,
+        "Invalid data for answer submission",
+        None,
+        "Invalid data for answer submission",
+        "Missing data for answer submission",
+    ]
+    assert results[0]["feedback"] == "Mention the index type." and results[2]["question_index"] == 2
+    # Only the valid answers are stored
+    assert len(api.collections["user_answers"].docs) == 2
@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("bson")
+
+from bson import ObjectId
+
+from tests.fakes import FakeCollection
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor, fetch_page, keyset_filter
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _docs(make_id, count=7):
+    # Pairs of documents share a timestamp, so the _id tie-breaker matters
+    return [{"_id": make_id(i), "timestamp": START + timedelta(minutes=i // 2), "n": i} for i in range(count)]
+
+
+def _oid(i):
+    return ObjectId(f"{i:024x}")
+
+
+def _sid(i):
+    return f"id-{i:03d}"
+
+
+@pytest.mark.parametrize("make_id", [_oid, _sid], ids=["objectid", "str"])
+def test_cursor_round_trip_keeps_id_type(make_id):
+    doc = {"_id": make_id(5), "timestamp": START}
+    timestamp, doc_id = decode_cursor(encode_cursor(doc))
+    assert timestamp == START
+    assert doc_id == doc["_id"] and type(doc_id) is type(doc["_id"])
+
+
+def _encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+@pytest.mark.parametrize("token", [
+    pytest.param("not base64 !", id="not-base64"),
+    pytest.param(base64.urlsafe_b64encode(b"not json").decode("ascii"), id="not-json"),
+    pytest.param(_encode({"id": "x"}), id="missing-timestamp"),
+    pytest.param(_encode({"t": "yesterday", "id": "x"}), id="bad-timestamp"),
+    pytest.param(_encode({"t": START.isoformat(), "id": "nothex", "oid": True}), id="bad-objectid"),
+])
+def test_malformed_cursor_raises_invalid_cursor(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token)
+    with pytest.raises(InvalidCursor):
+        keyset_filter({"user_id": "u"}, token)
+
+
+def test_keyset_filter_without_cursor_is_the_query():
+    assert keyset_filter({"user_id": "u"}, None) == {"user_id": "u"}
+
+
+def test_keyset_filter_bounds_timestamp_and_breaks_ties_on_id():
+    doc = {"_id": "id-004", "timestamp": START}
+    query = keyset_filter({"user_id": "u"}, encode_cursor(doc))
+    assert query["$and"][0] == {"user_id": "u"}
+    after = query["$and"][1]
+    assert after["timestamp"] == {"$lte": START}
+    assert {"timestamp": START, "_id": {"$lt": "id-004"}} in after["$or"]
+
+
+@pytest.mark.parametrize("make_id", [_oid, _sid], ids=["objectid", "str"])
+def test_fetch_page_walks_every_document_once(make_id):
+    collection = FakeCollection(_docs(make_id))
+    seen, cursor, pages = [], None, 0
+    while True:
+        docs, cursor = fetch_page(collection, {}, None, cursor, limit=3)
+        seen += [doc["n"] for doc in docs]
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == [6, 5, 4, 3, 2, 1, 0]
+    assert pages == 3
+
+
+def test_last_page_has_no_cursor():
+    collection = FakeCollection(_docs(_sid, count=3))
+    docs, cursor = fetch_page(collection, {}, None, None, limit=3)
+    assert [doc["n"] for doc in docs] == [2, 1, 0]
+    assert cursor is None
+
+
+def test_fetch_page_applies_query_and_projection():
+    docs = _docs(_sid, count=4)
+    docs[3]["user_id"] = "someone-else"
+    collection = FakeCollection(docs)
+    page, cursor = fetch_page(collection, {"user_id": None}, {"timestamp": 0}, None, limit=10)
+    assert [doc["n"] for doc in page] == [2, 1, 0]
+    assert all("timestamp" not in doc for doc in page) and cursor is None
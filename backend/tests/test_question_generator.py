@@ -0,0 +1,72 @@
+import json
+import types
+
+import pytest
+
+from utils import question_generator, resources
+from utils.question_generator import _parse_answer_array, generate_expected_answers_batched
+
+
+@pytest.mark.parametrize("content, expected", [
+    pytest.param('["one", "two"]', ["one", "two"], id="plain-array"),
+    pytest.param('```json\n["one", "two"]\n```', ["one", "two"], id="fenced"),
+    pytest.param('Here you go:\n["one", "two"]\nGood luck!', ["one", "two"], id="surrounding-text"),
+    pytest.param('{"answers": ["one", "two"]}', ["one", "two"], id="answers-object"),
+    pytest.param('[{"answer": "one"}, {"answer": " two "}]', ["one", "two"], id="answer-objects"),
+    pytest.param('["one"]', ["one", None], id="short-array"),
+    pytest.param('["one", "  ", 3]', ["one", None], id="blank-and-non-string"),
+    pytest.param("I cannot answer these questions.", [None, None], id="not-json"),
+    pytest.param('{"result": ["one", "two"]}', [None, None], id="other-object"),
+])
+def test_parse_answer_array(content, expected):
+    assert _parse_answer_array(content, 2) == expected
+
+
+def test_parse_answer_array_ignores_extra_entries():
+    assert _parse_answer_array('["one", "two", "three"]', 2) == ["one", "two"]
+
+
+class _FakeClient:
+    """Replies to batched prompts with ``batch_reply`` and to single prompts with an answer"""
+
+    def __init__(self, batch_reply):
+        self.batch_reply = batch_reply
+        self.single_calls = 0
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, messages, max_tokens, **kwargs):
+        batched = "JSON array" in messages[-1]["content"]
+        if not batched:
+            self.single_calls += 1
+        content = self.batch_reply if batched else "Single answer"
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))],
+            usage=types.SimpleNamespace(prompt_tokens=100 if batched else 10)
+        )
+
+
+def test_batched_fallback_fills_gaps_and_counts_their_tokens(monkeypatch, capsys):
+    fake = _FakeClient(json.dumps(["First answer"]))
+    monkeypatch.setattr(resources, "llm_client", lambda: fake)
+
+    answers = generate_expected_answers_batched(["Q1", "Q2", "Q3"], skills=["Python"], batch_size=3)
+
+    assert answers == ["First answer", "Single answer", "Single answer"]
+    assert fake.single_calls == 2
+    output = capsys.readouterr().out
+    # One batched request plus two single-question fallbacks
+    assert "120 prompt tokens incl. fallbacks" in output
+    assert "2 fallback call(s)" in output
+    assert "latency saved" in output
+
+
+def test_batched_latency_saved_uses_single_question_timing(monkeypatch, capsys):
+    monkeypatch.setattr(resources, "llm_client", lambda: _FakeClient(json.dumps(["a", "b", "c", "d"])))
+    monkeypatch.setattr(question_generator, "_single_answer_seconds", lambda: 2.0)
+    monkeypatch.setattr(question_generator, "EXPECTED_ANSWER_WORKERS", 2)
+
+    generate_expected_answers_batched(["Q1", "Q2", "Q3", "Q4"], batch_size=4)
+
+    # Per-question mode: two rounds of 2s each with two workers
+    saved = float(capsys.readouterr().out.split("~")[-1].split("s latency saved")[0])
+    assert 3.9 < saved <= 4.0
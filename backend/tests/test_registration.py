@@ -0,0 +1,80 @@
+import os
+import threading
+import uuid
+
+import pytest
+
+from tests.fakes import FakeCollection
+
+# e.g. mongodb://localhost:27017; the concurrency test needs a real mongod
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI")
+
+
+class _IndexedCollection:
+    def __init__(self, indexes):
+        self.indexes = indexes
+
+    def index_information(self):
+        return self.indexes
+
+
+def test_missing_unique_indexes_reports_absent_and_non_unique():
+    pytest.importorskip("pymongo")
+    from utils.db_indexes import missing_unique_indexes
+    db = {"users": _IndexedCollection({
+        "_id_": {"key": [("_id", 1)]},
+        "email_1": {"key": [("email", 1)], "unique": True},
+        "username_1": {"key": [("username", 1)]},
+    })}
+    assert missing_unique_indexes(db, "users") == [[("username", 1)]]
+
+
+def test_register_refuses_without_unique_indexes(app_module, monkeypatch):
+    users = FakeCollection()
+    monkeypatch.setattr(app_module, "collections", {"users": users, "questions": None, "user_answers": None})
+    monkeypatch.setattr(app_module, "user_indexes_ready", False)
+
+    response = app_module.app.test_client().post(
+        "/api/register", json={"username": "ada", "email": "ada@example.com", "password": "secret"}
+    )
+
+    assert response.status_code == 503
+    assert users.docs == []
+
+
+@pytest.mark.skipif(not MONGO_TEST_URI, reason="set MONGO_TEST_URI to run against a local mongod")
+def test_concurrent_registrations_create_one_user(app_module, monkeypatch):
+    from pymongo import MongoClient
+    from utils.db_indexes import ensure_indexes, missing_unique_indexes
+
+    mongo = MongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=2000)
+    db_name = f"interview_app_test_{uuid.uuid4().hex[:8]}"
+    db = mongo[db_name]
+    try:
+        assert ensure_indexes(db) == [] and missing_unique_indexes(db, "users") == []
+        monkeypatch.setattr(app_module, "collections", {"users": db["users"], "questions": None, "user_answers": None})
+        monkeypatch.setattr(app_module, "user_indexes_ready", True)
+
+        workers = min(8, app_module.password_hashing.HASH_QUEUE_LIMIT)
+        barrier = threading.Barrier(workers)
+        statuses = []
+
+        def register(i):
+            client = app_module.app.test_client()
+            barrier.wait()
+            response = client.post("/api/register", json={
+                "username": f"user{i}", "email": "same@example.com", "password": "secret"
+            })
+            statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=register, args=(i,)) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) == [201] + [409] * (workers - 1)
+        assert db["users"].count_documents({"email": "same@example.com"}) == 1
+    finally:
+        mongo.drop_database(db_name)
+        mongo.close()
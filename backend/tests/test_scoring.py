@@ -0,0 +1,26 @@
+from utils.relevance import RelevanceIndex
+from utils.scoring import build_answer_index, score_answer, tokenize
+
+
+def test_tokenize_drops_stopwords_and_keeps_symbols():
+    assert tokenize("I don't think it's the C++ or C# approach") == ["think", "c++", "c#", "approach"]
+
+
+def test_score_answer_rewards_overlap_with_expected_answer():
+    index = build_answer_index([
+        "Indexes let the database find rows without scanning the whole table",
+        "A mutex serializes access to shared state between threads"
+    ])
+    good = score_answer("An index avoids scanning the whole table to find rows", index, 0, None)
+    bad = score_answer("Threads share state through a mutex", index, 0, None)
+    assert good["score"] > bad["score"]
+
+
+def test_relevance_index_ranks_skill_mentions_first():
+    index = RelevanceIndex(["Python", "Machine Learning"], "Built recommendation pipelines")
+    questions = [
+        "Describe a recent vacation",
+        "How did you build the recommendation pipelines?",
+        "How have you used Python for machine learning?"
+    ]
+    assert index.rank(questions) == [questions[2], questions[1]]
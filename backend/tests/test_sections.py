@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from utils.question_generator import JOB_TITLE_RE, extract_experience
+from utils.sections import HEADER_RE, get_section, segment_resume
+
+# Generous bound for ~200KB of hostile input; a backtracking blow-up takes far longer
+TIME_LIMIT = 1.0
+
+RESUME = """Jane Doe
+SUMMARY
+Backend engineer.
+
+Work Experience:
+Senior Engineer at Acme Corp, 2019-2023
+Built payment services.
+
+Technical Skills: Python, Go, PostgreSQL
+
+EDUCATION
+BSc Computer Science
+"""
+
+
+def test_segments_line_and_inline_headers():
+    sections = segment_resume(RESUME)
+    assert sections["experience"] == "Senior Engineer at Acme Corp, 2019-2023\nBuilt payment services."
+    assert sections["skills"] == "Python, Go, PostgreSQL"
+    assert sections["education"] == "BSc Computer Science"
+    assert sections["summary"] == "Backend engineer."
+
+
+def test_repeated_sections_are_joined():
+    text = "Skills: Python\nProjects\nA compiler\nSkills: Rust"
+    assert get_section(text, "skills") == "Python\nRust"
+
+
+def test_missing_section_and_empty_text():
+    assert get_section("Just some text", "skills") == ""
+    assert get_section(None, "experience") == ""
+    assert segment_resume("") == {}
+
+
+def test_experience_falls_back_to_job_title_lines():
+    text = "Staff Engineer at Globex Corporation\nLead Developer for Initech Systems"
+    assert extract_experience(text) == "Staff Engineer at Globex Corporation\nLead Developer for Initech Systems"
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+@pytest.mark.parametrize("text", [
+    # Near-miss header lines: decorations and runs of spaces that never end the line
+    pytest.param("#" * 200_000, id="hashes"),
+    pytest.param(" -*• " * 40_000 + "skills", id="bullets-then-header"),
+    pytest.param("skills " * 30_000, id="repeated-header-words"),
+    pytest.param("experience -" * 20_000, id="repeated-dashed-headers"),
+    pytest.param("\t" * 100_000 + "skills:" + "\t" * 100_000, id="tab-padded-header"),
+    pytest.param("Skills" + " " * 200_000 + "x", id="header-trailing-spaces"),
+    pytest.param("Skills:" + " " * 200_000 + "x", id="header-colon-trailing-spaces"),
+    pytest.param("Skills -" + "\t" * 200_000 + "x", id="header-dash-trailing-tabs"),
+    pytest.param(("Skills" + " " * 1_000 + "x\n") * 200, id="many-padded-lines"),
+])
+def test_header_scan_is_linear_on_adversarial_input(text):
+    _, elapsed = _timed(lambda: list(HEADER_RE.finditer(text)))
+    assert elapsed < TIME_LIMIT
+
+
+@pytest.mark.parametrize("text", [
+    # Capitalized words that never reach "at Company"
+    pytest.param("Senior " * 30_000, id="repeated-title-word"),
+    pytest.param("Engineer " * 20_000 + "at", id="titles-then-at"),
+    pytest.param("Aaaa\t" * 40_000 + "at acme", id="tab-separated-titles"),
+    pytest.param("Lead Senior Staff Principal Chief Engineer at " * 4_000, id="no-company"),
+    pytest.param("A" + "a" * 200_000 + " at B" + "b" * 200_000, id="huge-words"),
+])
+def test_job_title_scan_is_linear_on_adversarial_input(text):
+    _, elapsed = _timed(lambda: list(JOB_TITLE_RE.finditer(text)))
+    assert elapsed < TIME_LIMIT
+
+
+def test_segment_resume_scales_linearly():
+    block = RESUME * 50
+    _, small = _timed(segment_resume.__wrapped__, block)
+    _, large = _timed(segment_resume.__wrapped__, block * 10)
+    # Ten times the input should cost roughly ten times as much, not a hundred
+    assert large < max(small, 0.001) * 30
@@ -0,0 +1,70 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from tests.fakes import FakeCollection
+
+USER = {"_id": "user-1", "username": "ada", "email": "ada@example.com",
+        "password": b"hash", "created_at": datetime(2024, 1, 1)}
+
+
+@pytest.fixture
+def users(app_module, monkeypatch):
+    users = FakeCollection([USER, dict(USER, _id="user-2", username="bob", email="bob@example.com")])
+    monkeypatch.setattr(app_module, "collections", {"users": users, "questions": None, "user_answers": None})
+    app_module.session_cache.clear()
+    yield users
+    app_module.session_cache.clear()
+
+
+def _token(app_module, user_id, expires_in=3600):
+    import jwt
+    payload = {"user_id": user_id, "exp": int(time.time()) + expires_in}
+    return jwt.encode(payload, app_module.JWT_SECRET, algorithm=app_module.JWT_ALGORITHM)
+
+
+def _profile(app_module, token):
+    return app_module.app.test_client().get("/api/profile", headers={"Cookie": f"token={token}"})
+
+
+def test_cached_session_skips_the_lookup(app_module, users):
+    token = _token(app_module, "user-1")
+    assert _profile(app_module, token).status_code == 200
+    assert _profile(app_module, token).get_json()["username"] == "ada"
+    assert users.calls["find_one"] == 1
+    assert "password" not in app_module.session_cache.get(token)
+
+
+def test_session_is_not_cached_past_token_expiry(app_module, users):
+    token = _token(app_module, "user-1", expires_in=5)
+    assert app_module.load_session(token)["_id"] == "user-1"
+    expires_at, _ = app_module.session_cache._data[token]
+    assert expires_at - time.monotonic() <= 5
+    assert app_module.SESSION_CACHE_TTL > 5
+
+
+def test_logout_evicts_the_session(app_module, users):
+    token = _token(app_module, "user-1")
+    _profile(app_module, token)
+    assert app_module.session_cache.get(token) is not None
+
+    response = app_module.app.test_client().post("/api/logout", headers={"Cookie": f"token={token}"})
+
+    assert response.status_code == 200
+    assert app_module.session_cache.get(token) is None
+
+
+def test_invalidate_user_sessions_drops_only_that_user(app_module, users):
+    first, second = _token(app_module, "user-1"), _token(app_module, "user-1", expires_in=7200)
+    other = _token(app_module, "user-2")
+    for token in (first, second, other):
+        app_module.load_session(token)
+
+    assert app_module.invalidate_user_sessions("user-1") == 2
+
+    assert app_module.session_cache.get(first) is None and app_module.session_cache.get(second) is None
+    assert app_module.session_cache.get(other)["username"] == "bob"
+    # The next request reads the user again
+    app_module.load_session(first)
+    assert users.calls["find_one"] == 4
@@ -0,0 +1,89 @@
+import pytest
+
+from utils.skill_gazetteer import SkillGazetteer, _Automaton
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return SkillGazetteer().load_file()
+
+
+def test_automaton_reports_overlapping_matches():
+    automaton = _Automaton(enumerate(["he", "she", "his", "hers"]))
+    matches = sorted(automaton.iter_matches("ushers"))
+    assert matches == [(1, 4, 1), (2, 4, 0), (2, 6, 3)]
+
+
+def test_longest_match_wins(gazetteer):
+    assert gazetteer.find("Skills: C++, C") == ["C++", "C"]
+    assert gazetteer.find("Built services with C# and Node.js") == ["C#", "Node.js"]
+    assert gazetteer.find("Tools: Node, Express") == ["Node.js", "Express.js"]
+
+
+def test_matches_only_on_word_boundaries(gazetteer):
+    assert gazetteer.find("Scalable javascripting in Javaland") == []
+    assert gazetteer.find("JavaScript, Java") == ["JavaScript", "Java"]
+
+
+def test_case_insensitive_names_and_aliases(gazetteer):
+    assert gazetteer.find("python3 and REACTJS") == ["Python", "React"]
+
+
+def test_multi_word_names_match_across_line_breaks(gazetteer):
+    assert gazetteer.find("Spring\nBoot on\n  Google Cloud") == ["Spring Boot", "Google Cloud Platform"]
+
+
+def test_case_sensitive_names_need_exact_case(gazetteer):
+    assert gazetteer.find("Languages: go, rust") == []
+    assert gazetteer.find("Languages: Go, Rust") == ["Go", "Rust"]
+
+
+def test_case_sensitive_names_need_a_list(gazetteer):
+    prose = "I like to go to the park. Spring is nice. We did R&D at Acme. Grade C."
+    assert gazetteer.find(prose) == []
+    assert gazetteer.find("Skills: R&D, Excel") == ["Excel"]
+    assert gazetteer.find("Languages: C/C++, R | Go") == ["C", "C++", "R", "Go"]
+
+
+def test_add_reports_new_skills_and_invalidates_compiled_automata():
+    gazetteer = SkillGazetteer()
+    assert gazetteer.find("Kubeflow pipelines") == []
+    assert gazetteer.add("Kubeflow", [("kf pipelines", False)])
+    assert not gazetteer.add("kubeflow")
+    assert gazetteer.find("Kubeflow and KF Pipelines") == ["Kubeflow"]
+
+
+def test_learning_a_known_name_keeps_it_list_only():
+    gazetteer = SkillGazetteer().load_file()
+    assert not gazetteer.add("Go")
+    assert not gazetteer.add("Spring")
+    assert gazetteer.find("I like to go to the park. Spring is nice.") == []
+
+
+class _LearnedSkills:
+    def __init__(self, names):
+        self.docs = [{"name": name, "count": 5} for name in names]
+
+    def find(self, query, projection):
+        return self
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        return self.docs[:n]
+
+
+def test_extend_from_collection_skips_known_names_and_aliases():
+    gazetteer = SkillGazetteer().load_file()
+    added = gazetteer.extend_from_collection(_LearnedSkills(["go", "Spring", "golang", "Kubeflow Pipelines"]))
+    assert added == 1
+    assert gazetteer.find("Wrote golang at work, then spring cleaning") == ["Go"]
+
+
+def test_soft_skills_do_not_count_as_technical(gazetteer):
+    text = ("Strong communication and leadership, problem solving in agile teams, "
+            "project management, worked with Git")
+    found = gazetteer.find(text)
+    assert len(found) == 6
+    assert gazetteer.count_technical(found) == 2
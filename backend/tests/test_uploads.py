@@ -0,0 +1,58 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+CONTENT = b"%PDF-1.4 resume " * 1024
+
+
+def _upload(app_module, data=CONTENT, filename="Resume.PDF"):
+    from werkzeug.datastructures import FileStorage
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+
+def test_small_upload_is_read_into_memory(app_module):
+    source, digest = app_module.read_upload(_upload(app_module), content_length=len(CONTENT) + 200)
+    assert source == CONTENT
+    assert digest == hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.mark.parametrize("content_length", [None, 10 ** 9], ids=["unknown", "over-threshold"])
+def test_large_or_unsized_upload_is_spooled(app_module, content_length):
+    source, digest = app_module.read_upload(_upload(app_module), content_length=content_length)
+    try:
+        assert isinstance(source, str) and source.endswith(".pdf")
+        with open(source, "rb") as f:
+            assert f.read() == CONTENT
+        assert digest == hashlib.sha256(CONTENT).hexdigest()
+    finally:
+        app_module.discard_upload(source)
+    assert not os.path.exists(source)
+
+
+def test_declared_oversized_body_is_rejected(app_module):
+    client = app_module.app.test_client()
+    limit = app_module.app.config["MAX_CONTENT_LENGTH"]
+    response = client.post("/api/upload-resume-public-async", data=b"x", headers={"Content-Length": str(limit + 1)})
+    assert response.status_code == 413
+
+
+def test_cache_key_includes_lowercased_extension(app_module):
+    digest = hashlib.sha256(CONTENT).hexdigest()
+    assert app_module.resume_cache_key(digest, "cv.PDF") == app_module.resume_cache_key(digest, "resume.pdf")
+    assert app_module.resume_cache_key(digest, "cv.pdf") != app_module.resume_cache_key(digest, "cv.docx")
+    assert app_module.resume_cache_key(digest, "cv.pdf") != app_module.resume_cache_key(digest, "cv")
+
+
+def test_empty_extraction_is_not_cached(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "extract_upload_text", lambda source, filename: "  ")
+    monkeypatch.setattr(app_module, "extract_info", lambda text: {"skills": []})
+    monkeypatch.setattr(app_module, "generate_questions", lambda skills, resume_text: [])
+    monkeypatch.setattr(app_module, "generate_expected_answers", lambda questions, skills, resume_text: [])
+    stored = []
+    monkeypatch.setattr(app_module.resume_cache, "set", lambda key, value: stored.append(key))
+
+    result = app_module.run_resume_pipeline(CONTENT, "empty.pdf", hashlib.sha256(CONTENT).hexdigest())
+
+    assert result["questions"] == [] and stored == []
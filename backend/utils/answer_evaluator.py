@@ -1,27 +1,25 @@
-from openai import OpenAI
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 import nltk
+from utils import resources
+from utils.llm_cache import cached_chat_completion, completion_cache_key, llm_cache
 
-# Initialize NLTK resources
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
+def _load_stopwords():
+    """Make sure the NLTK corpora are available and return the English stopword set"""
+    for path, package in [('tokenizers/punkt', 'punkt'), ('corpora/stopwords', 'stopwords')]:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(package)
+    return frozenset(stopwords.words('english'))
 
-# Set the API key directly
-api_key = "6f70706e611fa0b4510b85c6e89830a7e0063795f56b88670707282a83a1eea0"
-os.environ["TOGETHER_API_KEY"] = api_key
+resources.register("nltk_stopwords", _load_stopwords)
 
-# Create client instance
-client = OpenAI(
-    base_url="https://api.together.xyz/v1",
-    api_key=api_key
-)
+# Parallel keyword extraction when a question set is created
+KEYWORD_WORKERS = int(os.getenv("KEYWORD_WORKERS", "4"))
 
 def preprocess_text(text):
     """Basic text preprocessing"""
@@ -32,11 +30,11 @@ def preprocess_text(text):
     text = re.sub(r'[^\w\s]', ' ', text)
     text = re.sub(r'\d+', ' ', text)
     
-    # Tokenize
+    # Tokenize (loading the stopwords also ensures punkt is downloaded)
+    stop_words = resources.get("nltk_stopwords")
     tokens = word_tokenize(text)
     
     # Remove stopwords
-    stop_words = set(stopwords.words('english'))
     tokens = [word for word in tokens if word not in stop_words]
     
     # Join tokens back into a string
@@ -54,7 +52,7 @@ def extract_keywords(text):
         Return only the key technical concepts as a comma-separated list, with no additional text.
         """
         
-        response = client.chat.completions.create(
+        keywords_text = cached_chat_completion(
             model="mistralai/Mixtral-8x7B-Instruct-v0.1",
             messages=[
                 {"role": "system", "content": "You extract essential technical concepts from text."},
@@ -62,9 +60,7 @@ def extract_keywords(text):
             ],
             temperature=0.1,
             max_tokens=100
-        )
-        
-        keywords_text = response.choices[0].message.content.strip()
+        ).strip()
         
         # Clean and split keywords
         keywords = [kw.strip() for kw in keywords_text.split(',') if kw.strip()]
@@ -73,68 +69,107 @@ def extract_keywords(text):
         print(f"Error extracting keywords: {str(e)}")
         
         # Fallback to simple frequency-based extraction
-        words = preprocess_text(text).split()
-        word_freq = {}
-        for word in words:
-            if len(word) > 3:  # Only consider words longer than 3 chars
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Sort by frequency and return top 5
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:5]]
+        return extract_keywords_local(text)
+
+def extract_keywords_local(text):
+    """Frequency-based keyword extraction that needs no network access"""
+    words = preprocess_text(text).split()
+    word_freq = {}
+    for word in words:
+        if len(word) > 3:  # Only consider words longer than 3 chars
+            word_freq[word] = word_freq.get(word, 0) + 1
+    
+    # Sort by frequency and return top 5
+    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
+    return [word for word, freq in sorted_words[:5]]
+
+def extract_keywords_for_answers(expected_answers, max_workers=KEYWORD_WORKERS):
+    """Extract the key concepts of every expected answer of a question set, in order.
 
-def compare_and_provide_feedback(user_answer, expected_answer):
+    Run once when the question set is created so that scoring fallbacks at
+    submission time are purely local.
+    """
+    if not expected_answers:
+        return []
+    workers = max(1, min(max_workers, len(expected_answers)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda answer: extract_keywords(answer) if answer else [], expected_answers))
+
+# Generic phrases scrubbed from LLM feedback
+GENERIC_PHRASES = [
+    "your answer has been recorded",
+    "consider reviewing",
+    "you can review",
+    "has been noted",
+    "feedback is recorded"
+]
+GENERIC_PHRASES_RE = re.compile("|".join(re.escape(p) for p in GENERIC_PHRASES), re.IGNORECASE)
+# Characters held back while streaming so a phrase split across chunks is still caught
+GENERIC_PHRASE_WINDOW = max(len(p) for p in GENERIC_PHRASES) - 1
+
+def _feedback_messages(user_answer, expected_answer):
+    """Build the chat messages for the feedback prompt"""
+    prompt = f"""
+    You are providing detailed feedback on a technical interview answer. Be specific, constructive, and direct.
+    
+    Expected Answer:
+    {expected_answer}
+    
+    User's Answer:
+    {user_answer}
+    
+    Provide specific feedback by:
+    1. Start with what the user did well (if anything)
+    2. Clearly identify which key technical concepts were missing or incorrect
+    3. Point out any misconceptions or errors
+    4. Suggest specific improvements with examples
+    5. Mention any additional points that would strengthen the answer
+    
+    Be direct and specific. Don't use generic phrases like "your answer has been recorded" or "consider reviewing". 
+    Give actionable, technical feedback that helps them improve their interview performance.
+    Keep the feedback concise but comprehensive - around 3-4 sentences maximum.
+    """
+    
+    return [
+        {"role": "system", "content": "You provide specific, actionable technical interview feedback without generic phrases."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _fallback_feedback(user_answer, expected_answer, expected_keywords=None):
+    """Keyword-based feedback used when the LLM is unavailable.
+
+    Uses the keywords precomputed for the question set when available and
+    otherwise extracts them locally, so it never makes a network call.
+    """
+    if not expected_keywords:
+        expected_keywords = extract_keywords_local(expected_answer)
+    user_text = user_answer.lower()
+    
+    missing_keywords = [keyword for keyword in expected_keywords if keyword.lower() not in user_text]
+    
+    if not missing_keywords:
+        return "Good coverage of the main concepts. To improve further, add specific examples and explain the reasoning behind your approach in more detail."
+    else:
+        missing_concepts = ", ".join(missing_keywords[:3])
+        return f"Your answer is missing key concepts: {missing_concepts}. Focus on explaining these areas with specific examples and technical details to provide a more complete response."
+
+def compare_and_provide_feedback(user_answer, expected_answer, expected_keywords=None):
     """Directly compare user answer with expected answer and provide detailed feedback"""
     try:
-        prompt = f"""
-        You are providing detailed feedback on a technical interview answer. Be specific, constructive, and direct.
-        
-        Expected Answer:
-        {expected_answer}
-        
-        User's Answer:
-        {user_answer}
-        
-        Provide specific feedback by:
-        1. Start with what the user did well (if anything)
-        2. Clearly identify which key technical concepts were missing or incorrect
-        3. Point out any misconceptions or errors
-        4. Suggest specific improvements with examples
-        5. Mention any additional points that would strengthen the answer
-        
-        Be direct and specific. Don't use generic phrases like "your answer has been recorded" or "consider reviewing". 
-        Give actionable, technical feedback that helps them improve their interview performance.
-        Keep the feedback concise but comprehensive - around 3-4 sentences maximum.
-        """
-        
-        response = client.chat.completions.create(
+        feedback = cached_chat_completion(
             model="mistralai/Mixtral-8x7B-Instruct-v0.1",
-            messages=[
-                {"role": "system", "content": "You provide specific, actionable technical interview feedback without generic phrases."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=_feedback_messages(user_answer, expected_answer),
             temperature=0.3,
             max_tokens=200
-        )
-        
-        feedback = response.choices[0].message.content.strip()
+        ).strip()
         
         # Remove any generic phrases that might slip through
-        generic_phrases = [
-            "your answer has been recorded",
-            "consider reviewing",
-            "you can review",
-            "has been noted",
-            "feedback is recorded"
-        ]
-        
-        feedback_lower = feedback.lower()
-        for phrase in generic_phrases:
-            if phrase in feedback_lower:
-                feedback = feedback.replace(phrase, "").replace(phrase.capitalize(), "")
+        feedback = GENERIC_PHRASES_RE.sub("", feedback)
         
         # Clean up any extra spaces or punctuation
         feedback = ' '.join(feedback.split())
+        if not _has_words(feedback):
+            raise ValueError("Feedback was empty after filtering generic phrases")
         
         return feedback
         
@@ -142,16 +177,91 @@ def compare_and_provide_feedback(user_answer, expected_answer):
         print(f"Error generating feedback: {str(e)}")
         
         # Enhanced fallback feedback
-        expected_keywords = extract_keywords(expected_answer)
-        user_text = user_answer.lower()
-        
-        missing_keywords = [keyword for keyword in expected_keywords if keyword.lower() not in user_text]
+        return _fallback_feedback(user_answer, expected_answer, expected_keywords)
+
+def _has_words(text):
+    """Whether filtered feedback has any content beyond leftover punctuation"""
+    return any(ch.isalnum() for ch in text)
+
+class FeedbackStreamInterrupted(Exception):
+    """The feedback stream failed after part of the text was already sent"""
+
+def stream_feedback(user_answer, expected_answer, expected_keywords=None):
+    """Yield feedback text incrementally as the LLM produces it.
+
+    Generic phrases are filtered over a sliding window, so the concatenated
+    chunks match what ``compare_and_provide_feedback`` would return, including
+    its fallback when the model produces no usable text. Raises
+    ``FeedbackStreamInterrupted`` if the stream breaks after text was yielded.
+    """
+    pending = ""
+    held = ""  # punctuation-only text kept back until real words follow
+    emitted = False
+    at_space = True  # collapse whitespace across chunk boundaries
+    
+    def normalize(text):
+        nonlocal at_space
+        text = re.sub(r'\s+', ' ', text)
+        if at_space and text.startswith(' '):
+            text = text[1:]
+        if text:
+            at_space = text.endswith(' ')
+        return text
+    
+    messages = _feedback_messages(user_answer, expected_answer)
+    cache_key = completion_cache_key("mistralai/Mixtral-8x7B-Instruct-v0.1", messages, 0.3, 200)
+    cached = llm_cache.get(cache_key)
+    if cached and cached.strip():
+        feedback = ' '.join(GENERIC_PHRASES_RE.sub("", cached.strip()).split())
+        yield feedback if _has_words(feedback) else _fallback_feedback(user_answer, expected_answer, expected_keywords)
+        return
+    
+    try:
+        stream = resources.llm_client().chat.completions.create(
+            model="mistralai/Mixtral-8x7B-Instruct-v0.1",
+            messages=messages,
+            temperature=0.3,
+            max_tokens=200,
+            stream=True
+        )
         
-        if not missing_keywords:
-            return "Good coverage of the main concepts. To improve further, add specific examples and explain the reasoning behind your approach in more detail."
-        else:
-            missing_concepts = ", ".join(missing_keywords[:3])
-            return f"Your answer is missing key concepts: {missing_concepts}. Focus on explaining these areas with specific examples and technical details to provide a more complete response."
+        raw = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            raw.append(delta)
+            pending = GENERIC_PHRASES_RE.sub("", pending + delta)
+            safe = len(pending) - GENERIC_PHRASE_WINDOW
+            if safe > 0:
+                text = normalize(pending[:safe])
+                pending = pending[safe:]
+                if text and not emitted and not _has_words(text):
+                    held += text
+                elif text:
+                    emitted = True
+                    yield held + text
+                    held = ""
+        completion = "".join(raw)
+        # Blank completions are retried next time rather than memoized
+        if completion.strip():
+            llm_cache.set(cache_key, completion)
+    except Exception as e:
+        print(f"Error streaming feedback: {str(e)}")
+        if emitted:
+            raise FeedbackStreamInterrupted(str(e)) from e
+        # Nothing was sent yet, so the whole fallback can be used
+        yield _fallback_feedback(user_answer, expected_answer, expected_keywords)
+        return
+    
+    text = normalize(GENERIC_PHRASES_RE.sub("", pending)).rstrip()
+    if emitted and text:
+        yield text
+    elif not emitted and _has_words(text):
+        yield (held + text).strip()
+    elif not emitted:
+        # Empty completion, or nothing but generic phrases
+        yield _fallback_feedback(user_answer, expected_answer, expected_keywords)
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize=128, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry else default
+
+    def pop_where(self, predicate):
+        """Drop every entry whose value matches ``predicate``; returns how many were dropped"""
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0
+            }
+
+
+class TieredCache:
+    """In-process TTLCache backed by an optional MongoDB collection shared by all workers.
+
+    Documents in the collection look like ``{_id: key, value: ..., expires_at: datetime}``;
+    a TTL index on ``expires_at`` lets MongoDB purge stale entries on its own.
+    """
+
+    def __init__(self, maxsize=128, ttl=3600):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.collection = None
+        self.shared_hits = 0
+
+    def attach_collection(self, collection):
+        """Use ``collection`` as the shared tier (pass None to disable it)"""
+        self.collection = collection
+        if collection is None:
+            return
+        try:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            print(f"⚠️ Cache index creation warning: {e}")
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.collection is None:
+            return default
+        try:
+            doc = self.collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        except Exception as e:
+            print(f"Shared cache lookup failed: {e}")
+            return default
+        if not doc:
+            return default
+        self.shared_hits += 1
+        self.memory.set(key, doc["value"])
+        return doc["value"]
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.collection is None:
+            return
+        try:
+            self.collection.replace_one(
+                {"_id": key},
+                {"_id": key, "value": value, "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl)},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Shared cache write failed: {e}")
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats["shared_hits"] = self.shared_hits
+        stats["shared_tier"] = self.collection is not None
+        return stats
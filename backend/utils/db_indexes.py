@@ -0,0 +1,187 @@
+"""Declared MongoDB indexes and an explain-plan check for the queries the API runs.
+
+Run against a local mongod to verify every endpoint query is served by an index:
+
+    python -m utils.db_indexes mongodb://localhost:27017 interview_app_test
+"""
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING
+
+from utils.pagination import encode_cursor, keyset_filter
+
+# collection -> list of (keys, options)
+INDEX_SPECS = {
+    "users": [
+        ([("email", ASCENDING)], {"unique": True}),
+        ([("username", ASCENDING)], {"unique": True})
+    ],
+    "questions": [
+        # Question history per owner, newest first
+        ([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], {})
+    ],
+    "user_answers": [
+        # Answers for one question of a set
+        ([("question_set_id", ASCENDING), ("question_index", ASCENDING)], {}),
+        # Answer history and progress per user, newest first
+        ([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], {})
+    ],
+    "learned_skills": [
+        # Most frequently learned skills first, for the gazetteer refresh
+        ([("count", DESCENDING)], {})
+    ]
+}
+
+# Fields too heavy to send back in history listings
+QUESTION_SUMMARY_PROJECTION = {"expected_answers": 0, "expected_keywords": 0}
+ANSWER_SUMMARY_PROJECTION = {"user_answer": 0, "expected_answer": 0}
+
+# (description, collection, filter, sort) for every first-page list query the endpoints run
+_LIST_QUERIES = [
+    ("question-history-public", "questions", {"user_id": "public_user", "status": {"$in": ["completed", None]}}),
+    ("answer-history", "user_answers", {"user_id": "example-user"}),
+    ("answer-history-public", "user_answers", {"user_id": {"$in": ["public_user", None]}})
+]
+_NEWEST_FIRST = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+_EXAMPLE_CURSOR = encode_cursor({"_id": "example-id", "timestamp": datetime(2024, 1, 1)})
+
+QUERY_PLANS = (
+    [(description, collection, query, _NEWEST_FIRST) for description, collection, query in _LIST_QUERIES]
+    # Later pages add the keyset condition from utils.pagination
+    + [(f"{description} (next page)", collection, keyset_filter(query, _EXAMPLE_CURSOR), _NEWEST_FIRST)
+       for description, collection, query in _LIST_QUERIES]
+    + [("answers-for-question", "user_answers", {"question_set_id": "example-set", "question_index": 0}, None)]
+)
+
+
+def answer_progress_pipeline(user_id, questions_collection="questions"):
+    """Aggregation behind /api/answer-progress: per-question-set progress of one user"""
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$group": {
+            "_id": "$question_set_id",
+            "answers": {"$sum": 1},
+            "answered_indexes": {"$addToSet": "$question_index"},
+            "average_score": {"$avg": "$score.score"},
+            "best_score": {"$max": "$score.score"},
+            "last_answered": {"$max": "$timestamp"}
+        }},
+        {"$lookup": {
+            "from": questions_collection,
+            "localField": "_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"total_questions": {"$size": {"$ifNull": ["$questions", []]}}}}],
+            "as": "question_set"
+        }},
+        {"$project": {
+            "_id": 0,
+            "question_set_id": "$_id",
+            "answers": 1,
+            "answered_questions": {"$size": "$answered_indexes"},
+            "total_questions": {"$ifNull": [{"$first": "$question_set.total_questions"}, None]},
+            "average_score": {"$round": ["$average_score", 1]},
+            "best_score": 1,
+            "last_answered": 1
+        }},
+        {"$sort": {"last_answered": -1}}
+    ]
+
+
+# (description, collection, pipeline) for every aggregation the endpoints run
+AGGREGATION_PLANS = [
+    ("answer-progress", "user_answers", answer_progress_pipeline("example-user"))
+]
+
+
+def ensure_indexes(db):
+    """Create every declared index (no-op for indexes that already exist).
+
+    One failing index (e.g. a unique index over existing duplicates) does not
+    stop the others; returns a list of problems, empty when all were created.
+    """
+    problems = []
+    for collection_name, specs in INDEX_SPECS.items():
+        for keys, options in specs:
+            try:
+                db[collection_name].create_index(keys, **options)
+            except Exception as e:
+                problems.append(f"{collection_name} {keys}: {e}")
+    return problems
+
+
+def missing_unique_indexes(db, collection_name="users"):
+    """Keys of the declared unique indexes of ``collection_name`` that the database lacks"""
+    present = {
+        tuple((field, direction) for field, direction in spec["key"])
+        for spec in db[collection_name].index_information().values()
+        if spec.get("unique")
+    }
+    return [
+        keys for keys, options in INDEX_SPECS.get(collection_name, [])
+        if options.get("unique") and tuple(keys) not in present
+    ]
+
+
+def _plan_stages(plan):
+    """Yield the stage names of a winning plan tree"""
+    yield plan.get("stage")
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            yield from _plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def _index_problems(description, winning_plan, allow_sort=False):
+    stages = set(_plan_stages(winning_plan))
+    problems = []
+    if "COLLSCAN" in stages:
+        problems.append(f"{description}: collection scan")
+    if "SORT" in stages and not allow_sort:
+        problems.append(f"{description}: in-memory sort")
+    if not stages & {"IXSCAN", "EXPRESS_IXSCAN"}:
+        problems.append(f"{description}: no index scan ({', '.join(sorted(filter(None, stages)))})")
+    return problems
+
+
+def _aggregation_query_planner(explain):
+    """queryPlanner section of an aggregate explain (top level, or the first $cursor stage)"""
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"]
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"]["queryPlanner"]
+    return {"winningPlan": {}}
+
+
+def check_query_plans(db, limit=20):
+    """Explain each declared query and aggregation; returns a list of problems (empty when all use indexes)"""
+    problems = []
+    for description, collection_name, query, sort in QUERY_PLANS:
+        cursor = db[collection_name].find(query).limit(limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = cursor.explain()
+        problems += _index_problems(description, explain["queryPlanner"]["winningPlan"])
+
+    for description, collection_name, pipeline in AGGREGATION_PLANS:
+        explain = db.command("aggregate", collection_name, pipeline=pipeline, explain=True)
+        winning_plan = _aggregation_query_planner(explain)["winningPlan"]
+        # Only the $match has to use an index; sorting the grouped results is expected
+        problems += _index_problems(description, winning_plan, allow_sort=True)
+    return problems
+
+
+if __name__ == "__main__":
+    import sys
+    from pymongo import MongoClient
+
+    uri = sys.argv[1] if len(sys.argv) > 1 else "mongodb://localhost:27017"
+    db_name = sys.argv[2] if len(sys.argv) > 2 else "interview_app_index_check"
+    db = MongoClient(uri, serverSelectionTimeoutMS=5000)[db_name]
+    problems = ensure_indexes(db) + check_query_plans(db)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"✅ All {len(QUERY_PLANS) + len(AGGREGATION_PLANS)} queries are served by indexes")
@@ -1,41 +1,171 @@
 import fitz  # PyMuPDF
 import docx
-import spacy
-from openai import OpenAI
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+import io
+import multiprocessing
 import os
 import re
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from utils import resources
+from utils.skill_gazetteer import find_skills, count_technical_skills, record_llm_skills, MIN_GAZETTEER_SKILLS
 
-# Set the API key directly
-os.environ["TOGETHER_API_KEY"] = "6f70706e611fa0b4510b85c6e89830a7e0063795f56b88670707282a83a1eea0"
-
-# Initialize the OpenAI client - use the API key directly
-client = OpenAI(
-    base_url="https://api.together.xyz/v1",
-    api_key="6f70706e611fa0b4510b85c6e89830a7e0063795f56b88670707282a83a1eea0"  # Set key directly
-)
-
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import spacy.cli
-    spacy.cli.download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-
-def extract_text(file_path):
-    """Extract text from PDF or DOCX files"""
-    if file_path.endswith(".pdf"):
-        doc = fitz.open(file_path)
-        return " ".join(page.get_text() for page in doc)
-    elif file_path.endswith(".docx"):
-        doc = docx.Document(file_path)
-        return " ".join([p.text for p in doc.paragraphs])
+# Downstream uses at most 100000 characters (spaCy) of a resume
+EXTRACT_MAX_CHARS = int(os.getenv("EXTRACT_MAX_CHARS", "100000"))
+# PDFs with at least this many pages are extracted across a process pool
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "50"))
+PDF_PROCESS_WORKERS = int(os.getenv("PDF_PROCESS_WORKERS", "2"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "10"))
+
+# Only entities are used, so skip the rest of the pipeline. In en_core_web_sm the
+# ner component has its own internal tok2vec; the shared one only feeds the
+# tagger and parser
+SPACY_EXCLUDED_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+SPACY_ENTITY_LABELS = {"ORG", "PRODUCT"}
+SPACY_MAX_CHARS = 100000  # Limit text size to prevent processing errors
+SPACY_CHUNK_CHARS = int(os.getenv("SPACY_CHUNK_CHARS", "5000"))
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+def _load_spacy():
+    """Load the spaCy model with only the components NER needs"""
+    import spacy
+    try:
+        return spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDED_COMPONENTS)
+    except OSError:
+        import spacy.cli
+        spacy.cli.download("en_core_web_sm")
+        return spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDED_COMPONENTS)
+
+resources.register("spacy_nlp", _load_spacy)
+
+def _open_pdf(source):
+    """Open a PDF from a path, bytes or a file-like object"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    if hasattr(source, "read"):
+        return fitz.open(stream=source.read(), filetype="pdf")
+    return fitz.open(source)
+
+def _pdf_page_range_text(path, start, stop):
+    """Extract the text of pages [start, stop) of a PDF file (runs in a worker process)"""
+    with _open_pdf(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+# The gunicorn worker is multi-threaded (MongoDB monitors, HTTP pools, executors),
+# so pool processes are started from a clean server process instead of forking it
+_PDF_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_pdf_pool = None
+_pdf_pool_pid = None
+_pdf_pool_lock = threading.Lock()
+
+def _pdf_process_pool():
+    """Long-lived process pool for large PDFs, created on first use in each worker"""
+    global _pdf_pool, _pdf_pool_pid
+    with _pdf_pool_lock:
+        if _pdf_pool is None or _pdf_pool_pid != os.getpid():
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context(_PDF_START_METHOD)
+            )
+            _pdf_pool_pid = os.getpid()
+        return _pdf_pool
+
+def _iter_pdf_text(source):
+    if hasattr(source, "read"):
+        source = source.read()
+    with _open_pdf(source) as doc:
+        page_count = doc.page_count
+        if page_count < PDF_PARALLEL_PAGE_THRESHOLD or PDF_PROCESS_WORKERS < 2:
+            for page in doc:
+                yield page.get_text()
+            return
+
+    # Large PDF: extract page ranges in the process pool, yielding in page order.
+    # Tasks carry a file path, never the document bytes; in-memory PDFs are
+    # written to a temporary file once instead of being pickled per task.
+    spooled = None
+    if not isinstance(source, str):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(source)
+            spooled = source = tmp.name
+
+    # Only PDF_PROCESS_WORKERS ranges are in flight, so stopping early skips the rest
+    executor = _pdf_process_pool()
+    step = max(1, PDF_PAGES_PER_TASK)
+    ranges = ((start, min(start + step, page_count)) for start in range(0, page_count, step))
+    pending = deque()
+    try:
+        for start, stop in ranges:
+            pending.append(executor.submit(_pdf_page_range_text, source, start, stop))
+            if len(pending) >= PDF_PROCESS_WORKERS:
+                break
+        while pending:
+            pages = pending.popleft().result()
+            next_range = next(ranges, None)
+            if next_range:
+                pending.append(executor.submit(_pdf_page_range_text, source, *next_range))
+            yield from pages
+    finally:
+        for future in pending:
+            future.cancel()
+        if spooled:
+            # A running task may still have the file open; POSIX allows removing it
+            try:
+                os.remove(spooled)
+            except OSError:
+                pass
+
+def _iter_docx_text(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    doc = docx.Document(source)
+    # Walk the body lazily instead of materializing doc.paragraphs
+    for element in doc.element.body.iterchildren(qn("w:p")):
+        yield Paragraph(element, doc).text
+
+def iter_text(source, filename=None):
+    """Yield the text of a PDF page by page or a DOCX paragraph by paragraph.
+
+    ``source`` is a path, bytes or a file-like object; for the latter two the
+    document type is taken from ``filename``.
+    """
+    name = (filename or (source if isinstance(source, str) else "")).lower()
+    if name.endswith(".pdf"):
+        return _iter_pdf_text(source)
+    elif name.endswith(".docx"):
+        return _iter_docx_text(source)
     else:
-        return ""
+        return iter(())
+
+def extract_text(source, filename=None, max_chars=EXTRACT_MAX_CHARS):
+    """Extract text from PDF or DOCX files, given as a path, bytes or file-like object.
+
+    Stops reading once ``max_chars`` characters are available, since nothing
+    downstream looks further than that.
+    """
+    parts = []
+    length = 0
+    chunks = iter_text(source, filename)
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            length += len(chunk) + 1
+            if max_chars and length >= max_chars:
+                break
+    finally:
+        # Closes the document handle even when we stop early
+        if hasattr(chunks, "close"):
+            chunks.close()
+    text = " ".join(parts)
+    return text[:max_chars] if max_chars else text
 
 def extract_skills_with_llm(text):
     """Use Together AI to extract skills from resume text"""
-    response = client.chat.completions.create(
+    response = resources.llm_client().chat.completions.create(
         model="mistralai/Mixtral-8x7B-Instruct-v0.1",
         messages=[
             {"role": "system", "content": "You are an expert at parsing resumes and identifying technical and soft skills."},
@@ -53,19 +183,74 @@ def extract_skills_with_llm(text):
     
     return list(set(skills))  # Remove duplicates
 
+def _chunk_text(text, size=SPACY_CHUNK_CHARS):
+    """Split text into chunks of about ``size`` characters on line boundaries"""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            newline = text.rfind("\n", start, end)
+            if newline > start:
+                end = newline + 1
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+def extract_entities_batch(texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+    """Extract ORG/PRODUCT entities for many texts with a single nlp.pipe pass.
+
+    Returns one entity list per input text, in order.
+    """
+    chunks, owners = [], []
+    for i, text in enumerate(texts):
+        for chunk in _chunk_text(text[:SPACY_MAX_CHARS]):
+            chunks.append(chunk)
+            owners.append(i)
+
+    entities = [[] for _ in texts]
+    nlp = resources.get("spacy_nlp")
+    for owner, doc in zip(owners, nlp.pipe(chunks, batch_size=batch_size, n_process=n_process)):
+        entities[owner].extend(ent.text for ent in doc.ents if ent.label_ in SPACY_ENTITY_LABELS)
+    return entities
+
+def extract_entities(text):
+    """Extract ORG/PRODUCT entities from a single resume"""
+    return extract_entities_batch([text], n_process=1)[0]
+
 def extract_info(text):
     """Extract information from resume text"""
-    # First use spaCy to try to extract some entities
-    doc = nlp(text[:100000])  # Limit text size to prevent processing errors
-    spacy_skills = [ent.text for ent in doc.ents if ent.label_ in ["ORG", "PRODUCT"]]
+    # Match the local skill taxonomy first
+    gazetteer_skills = find_skills(text)
+    
+    # Use spaCy to try to extract some entities
+    spacy_skills = extract_entities(text)
     
-    # Then use LLM to extract skills
-    llm_skills = extract_skills_with_llm(text)
+    # Only ask the LLM when the taxonomy covers too little of the resume
+    llm_skills = []
+    if count_technical_skills(gazetteer_skills) < MIN_GAZETTEER_SKILLS:
+        llm_skills = extract_skills_with_llm(text)
+        record_llm_skills(llm_skills)
     
-    # Combine both skill sets
-    all_skills = list(set(spacy_skills + llm_skills))
+    # Combine the skill sets
+    all_skills = list(dict.fromkeys(gazetteer_skills + spacy_skills + llm_skills))
     
     return {
         "skills": all_skills,
         "raw_text": text
-    }
\ No newline at end of file
+    }
+
+# Offline batch mode: python -m utils.extractor resume1.pdf resume2.docx ...
+if __name__ == "__main__":
+    import sys
+    import time
+
+    paths = sys.argv[1:]
+    texts = [extract_text(path) for path in paths]
+    started = time.perf_counter()
+    results = extract_entities_batch(texts)
+    elapsed = time.perf_counter() - started
+    for path, entities in zip(paths, results):
+        print(f"{path}: {', '.join(sorted(set(entities)))}")
+    if paths:
+        print(f"\n{len(paths)} resumes in {elapsed:.2f}s ({elapsed / len(paths) * 1000:.1f} ms/resume)")
@@ -0,0 +1,43 @@
+import hashlib
+import json
+import os
+
+from utils import resources
+from utils.cache import TieredCache
+
+# Memoizes low-temperature completions whose output is effectively deterministic
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2048"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+
+llm_cache = TieredCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+
+
+def completion_cache_key(model, messages, temperature, max_tokens):
+    """Key a completion on (model, prompt hash, temperature, max_tokens)"""
+    prompt_hash = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{model}:{prompt_hash}:{temperature}:{max_tokens}"
+
+
+def cached_chat_completion(model, messages, temperature, max_tokens):
+    """Return the completion text for the request, calling the LLM only on a cache miss.
+
+    Raises ``ValueError`` when the model returns no content, so callers fall
+    back the same way they do for failed requests.
+    """
+    key = completion_cache_key(model, messages, temperature, max_tokens)
+    content = llm_cache.get(key)
+    # Blank entries (written before blank completions were rejected) count as misses
+    if content and content.strip():
+        return content
+
+    response = resources.llm_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    content = response.choices[0].message.content
+    if not content or not content.strip():
+        raise ValueError("LLM returned an empty completion")
+    llm_cache.set(key, content)
+    return content
@@ -0,0 +1,74 @@
+import importlib.util
+import os
+import threading
+import weakref
+
+import httpx
+from openai import OpenAI
+
+# Transport tuning, shared by every module that talks to the LLM API
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.together.xyz/v1")
+LLM_API_KEY = os.getenv("TOGETHER_API_KEY", "6f70706e611fa0b4510b85c6e89830a7e0063795f56b88670707282a83a1eea0")
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+LLM_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))  # seconds
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+# HTTP/2 needs the optional h2 package
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+_stats_lock = threading.Lock()
+_seen_streams = weakref.WeakSet()
+_stats = {"requests": 0, "new_connections": 0, "tls_handshakes": 0, "http_versions": {}}
+
+
+def _record_response(response):
+    """httpx response hook: count requests and the connections they opened"""
+    stream = response.extensions.get("network_stream")
+    http_version = response.http_version
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["http_versions"][http_version] = _stats["http_versions"].get(http_version, 0) + 1
+        if stream is None or stream in _seen_streams:
+            return
+        _seen_streams.add(stream)
+        _stats["new_connections"] += 1
+        if response.url.scheme == "https":
+            _stats["tls_handshakes"] += 1
+
+
+def transport_stats():
+    """Connection reuse metrics for the shared LLM transport"""
+    with _stats_lock:
+        stats = dict(_stats, http_versions=dict(_stats["http_versions"]))
+    requests = stats["requests"]
+    stats["connection_reuse_ratio"] = round(1 - stats["new_connections"] / requests, 3) if requests else 0.0
+    stats["http2_enabled"] = LLM_HTTP2
+    stats["pool_size"] = LLM_POOL_SIZE
+    return stats
+
+
+def build_llm_client():
+    """Build the OpenAI-compatible client on a pooled, keep-alive HTTP transport.
+
+    Timeouts and the retry budget (exponential backoff between attempts) are
+    applied to every request made through the client.
+    """
+    http_client = httpx.Client(
+        http2=LLM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=LLM_POOL_SIZE,
+            max_keepalive_connections=LLM_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        event_hooks={"response": [_record_response]}
+    )
+    return OpenAI(
+        base_url=LLM_BASE_URL,
+        api_key=LLM_API_KEY,
+        http_client=http_client,
+        timeout=LLM_REQUEST_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES
+    )
@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc):
+    """Opaque keyset cursor pointing just after ``doc`` in (timestamp, _id) descending order"""
+    doc_id = doc["_id"]
+    payload = {
+        "t": doc["timestamp"].isoformat(),
+        "id": str(doc_id),
+        "oid": isinstance(doc_id, ObjectId)
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token):
+    """Return (timestamp, _id) from a cursor produced by ``encode_cursor``"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        timestamp = datetime.fromisoformat(payload["t"])
+        doc_id = ObjectId(payload["id"]) if payload.get("oid") else payload["id"]
+        return timestamp, doc_id
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_filter(query, cursor):
+    """Restrict ``query`` to documents after ``cursor`` in (timestamp, _id) descending order"""
+    if not cursor:
+        return query
+    timestamp, doc_id = decode_cursor(cursor)
+    # The $lte bound lets the (..., timestamp, _id) indexes seek to the cursor
+    # instead of filtering the $or against every earlier entry
+    after = {
+        "timestamp": {"$lte": timestamp},
+        "$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": doc_id}}
+        ]
+    }
+    return {"$and": [query, after]} if query else after
+
+
+def fetch_page(collection, query, projection, cursor, limit):
+    """Fetch one page of newest-first documents.
+
+    Returns ``(docs, next_cursor)``; only ``limit + 1`` documents are read, so
+    memory use does not grow with the collection.
+    """
+    docs = list(
+        collection.find(keyset_filter(query, cursor), projection)
+        .sort([("timestamp", -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def iter_json_array(docs, transform=None):
+    """Serialize documents as a JSON array one element at a time"""
+    yield "["
+    for i, doc in enumerate(docs):
+        if transform:
+            doc = transform(doc)
+        yield ("," if i else "") + json.dumps(doc, default=_json_default)
+    yield "]"
@@ -0,0 +1,144 @@
+"""bcrypt hashing on a small bounded thread pool.
+
+bcrypt releases the GIL while hashing, so running it on HASH_WORKERS threads
+caps the CPU a burst of sign-ups or logins can take while the request threads
+stay free for other routes. At most HASH_QUEUE_LIMIT hashes may be running or
+waiting; beyond that callers get ``HashingSaturated`` instead of queueing.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from utils import resources
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(HASH_WORKERS * 4)))
+HASH_WAIT_TIMEOUT = float(os.getenv("HASH_WAIT_TIMEOUT", "10"))  # seconds
+
+# Fixed cost factor; when unset it is calibrated to BCRYPT_TARGET_MS. The floor
+# matches bcrypt.gensalt()'s default so calibration can only raise the cost.
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "12"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "14"))
+BCRYPT_CALIBRATION_SAMPLES = int(os.getenv("BCRYPT_CALIBRATION_SAMPLES", "3"))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+_stats_lock = threading.Lock()
+_stats = {"pending": 0, "completed": 0, "rejected": 0, "seconds": 0.0}
+
+
+class HashingSaturated(Exception):
+    """Raised when HASH_QUEUE_LIMIT hashes are already running or queued"""
+
+
+def _calibrate_rounds():
+    """Highest cost factor whose hash time stays within BCRYPT_TARGET_MS"""
+    if BCRYPT_ROUNDS:
+        return int(BCRYPT_ROUNDS)
+    # One untimed hash to warm up, then the median of a few timed samples
+    salt = bcrypt.gensalt(BCRYPT_MIN_ROUNDS)
+    bcrypt.hashpw(b"calibration", salt)
+    samples = []
+    for _ in range(max(1, BCRYPT_CALIBRATION_SAMPLES)):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration", salt)
+        samples.append((time.perf_counter() - started) * 1000)
+    elapsed_ms = sorted(samples)[len(samples) // 2]
+    rounds = BCRYPT_MIN_ROUNDS
+    # Each extra round doubles the work
+    while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= BCRYPT_TARGET_MS:
+        rounds += 1
+        elapsed_ms *= 2
+    print(f"✅ bcrypt cost factor {rounds} (~{elapsed_ms:.0f}ms per hash)")
+    return rounds
+
+resources.register("bcrypt_rounds", _calibrate_rounds)
+
+
+def _submit(fn, *args):
+    """Queue ``fn`` on the hashing pool and return its future, or raise HashingSaturated"""
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats["rejected"] += 1
+        raise HashingSaturated("Password hashing is saturated")
+
+    def timed():
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with _stats_lock:
+                _stats["pending"] -= 1
+                _stats["completed"] += 1
+                _stats["seconds"] += time.perf_counter() - started
+            _slots.release()
+
+    with _stats_lock:
+        _stats["pending"] += 1
+    return _executor.submit(timed)
+
+
+def _hash(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(resources.get("bcrypt_rounds")))
+
+
+def hash_password(password):
+    """bcrypt hash of ``password`` at the current cost factor"""
+    return _submit(_hash, password).result(timeout=HASH_WAIT_TIMEOUT)
+
+
+def rehash_in_background(password, on_hashed):
+    """Hash ``password`` at the current cost without waiting and pass the hash to ``on_hashed``.
+
+    Skipped (returns False) when the pool is saturated; the next login retries.
+    """
+    try:
+        future = _submit(_hash, password)
+    except HashingSaturated:
+        return False
+
+    def done(f):
+        try:
+            on_hashed(f.result())
+        except Exception as e:
+            print(f"⚠️ Password rehash failed: {e}")
+
+    future.add_done_callback(done)
+    return True
+
+
+def check_password(password, stored_hash):
+    """Whether ``password`` matches ``stored_hash`` (bytes or str)"""
+    if isinstance(stored_hash, str):
+        stored_hash = stored_hash.encode('utf-8')
+    return _submit(bcrypt.checkpw, password.encode('utf-8'), stored_hash).result(timeout=HASH_WAIT_TIMEOUT)
+
+
+def needs_rehash(stored_hash):
+    """Whether ``stored_hash`` was made with a lower cost factor than the current one"""
+    if isinstance(stored_hash, bytes):
+        stored_hash = stored_hash.decode('utf-8', 'replace')
+    try:
+        return int(stored_hash.split('$')[2]) < resources.get("bcrypt_rounds")
+    except (IndexError, ValueError):
+        return False
+
+
+def stats():
+    rounds = resources.get("bcrypt_rounds")
+    with _stats_lock:
+        completed = _stats["completed"]
+        return {
+            "workers": HASH_WORKERS,
+            "queue_limit": HASH_QUEUE_LIMIT,
+            "pending": _stats["pending"],
+            "completed": completed,
+            "rejected": _stats["rejected"],
+            "avg_ms": round(_stats["seconds"] * 1000 / completed, 1) if completed else 0.0,
+            "rounds": rounds
+        }
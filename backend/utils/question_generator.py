@@ -1,19 +1,52 @@
 import os
-from openai import OpenAI
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
+from utils import resources
+from utils.skill_gazetteer import find_skills, count_technical_skills, record_llm_skills, MIN_GAZETTEER_SKILLS
+from utils.sections import get_section
+from utils.relevance import RelevanceIndex
 
-# Set the API key directly
-api_key = "6f70706e611fa0b4510b85c6e89830a7e0063795f56b88670707282a83a1eea0"
-os.environ["TOGETHER_API_KEY"] = api_key
+# Concurrency settings for expected-answer generation (timeouts and retries are
+# configured on the shared client in utils/llm_transport.py)
+EXPECTED_ANSWER_WORKERS = int(os.getenv("EXPECTED_ANSWER_WORKERS", "4"))
 
-# Create client instance
-client = OpenAI(
-    base_url="https://api.together.xyz/v1",
-    api_key=api_key
+# Experience context included in prompts
+EXPERIENCE_MAX_CHARS = int(os.getenv("EXPERIENCE_MAX_CHARS", "3000"))
+# "Senior Software Engineer at Acme Corp" style lines, used when there is no
+# Experience section; repetition is bounded so the scan stays linear
+JOB_TITLE_RE = re.compile(
+    r'\b(?:[A-Z][a-z]+[ \t]+){1,5}(?:at|in|for|with)[ \t]+[A-Z][a-z]+(?:[ \t]+[A-Z][a-z]+){1,5}\b'
 )
+SKILL_DELIMITER_RE = re.compile(r'[,|•;\n]')
+
+# Supplemental question prompts run concurrently; resumes with fewer skills than
+# the threshold start them alongside the primary prompt (0 disables speculation)
+QUESTION_PROMPT_WORKERS = int(os.getenv("QUESTION_PROMPT_WORKERS", "6"))
+SPECULATIVE_SKILL_THRESHOLD = int(os.getenv("SPECULATIVE_SKILL_THRESHOLD", "3"))
+_question_executor = ThreadPoolExecutor(max_workers=QUESTION_PROMPT_WORKERS, thread_name_prefix="question-prompt")
+
+# "parallel" sends one prompt per question, "batched" sends chunks of questions per prompt
+EXPECTED_ANSWER_MODE = os.getenv("EXPECTED_ANSWER_MODE", "parallel")
+EXPECTED_ANSWER_BATCH_SIZE = int(os.getenv("EXPECTED_ANSWER_BATCH_SIZE", "5"))
+
+# Observed latency of single-question answer requests, used to estimate what
+# batching saves over per-question prompts
+_single_answer_lock = threading.Lock()
+_single_answer_timing = {"calls": 0, "seconds": 0.0}
 
 def extract_skills_from_resume(resume_text):
     """Extract only explicitly mentioned skills from resume"""
+    # The local skill taxonomy handles most resumes without an LLM call
+    gazetteer_skills = find_skills(resume_text)
+    if count_technical_skills(gazetteer_skills) >= MIN_GAZETTEER_SKILLS:
+        return gazetteer_skills
+    
+    # Send only the Skills section when the resume has one
+    skills_section = get_section(resume_text, "skills")
+    
     # This is a very direct prompt to extract only skills explicitly listed
     prompt = f"""
     The resume below has a "Skills" section.
@@ -21,10 +54,10 @@ def extract_skills_from_resume(resume_text):
     Return just the skills as a comma-separated list with no additional text or explanation.
     
     Resume:
-    {resume_text}
+    {f"Skills: {skills_section}" if skills_section else resume_text}
     """
     
-    response = client.chat.completions.create(
+    response = resources.llm_client().chat.completions.create(
         model="mistralai/Mixtral-8x7B-Instruct-v0.1",
         messages=[
             {"role": "system", "content": "You are a resume parser that extracts only explicitly mentioned skills."},
@@ -41,34 +74,23 @@ def extract_skills_from_resume(resume_text):
     
     # Clean up and split
     skills = [skill.strip() for skill in skills_text.split(',') if skill.strip()]
+    record_llm_skills(skills)
     
     # If no skills found or the model returned something else, 
     # do a direct pattern match for skills section
-    if not skills:
-        skills_match = re.search(r'Skills\s*[:-]\s*(.*?)(?=\w+\s*[:|\n]|$)', resume_text, re.IGNORECASE | re.DOTALL)
-        if skills_match:
-            skills_text = skills_match.group(1).strip()
-            # Split by common delimiters
-            skills = re.split(r'[,|•|-]', skills_text)
-            skills = [skill.strip() for skill in skills if skill.strip()]
-    
-    # Manually look for Python if it's mentioned anywhere
-    if 'python' not in [s.lower() for s in skills] and 'python' in resume_text.lower():
-        skills.append('Python')
+    if not skills and skills_section:
+        # Split by common delimiters
+        skills = SKILL_DELIMITER_RE.split(skills_section)
+        skills = [skill.strip() for skill in skills if skill.strip()]
+    
+    # Add whatever the taxonomy did find
+    known = {s.lower() for s in skills}
+    skills.extend(s for s in gazetteer_skills if s.lower() not in known)
     
     return skills
 
-def generate_questions(skills=None, resume_text=None):
-    """Generate technical interview questions based on specified skills and resume context"""
-    if resume_text and not skills:
-        skills = extract_skills_from_resume(resume_text)
-    
-    if not skills or len(skills) == 0:
-        return ["No specific skills were identified. Please check the resume format."]
-    
-    # Extract experience sections from resume
-    experience_text = extract_experience(resume_text)
-    
+def _question_messages(skills, experience_text):
+    """Build the chat messages for the primary question-generation prompt"""
     # Create a more detailed prompt
     prompt = f"""
     You are an expert technical interviewer. Generate interview questions based on the following resume:
@@ -86,123 +108,399 @@ def generate_questions(skills=None, resume_text=None):
     Format each question as a complete sentence.
     """
     
-    response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": "You are an expert technical interviewer. Generate relevant interview questions based on candidate's skills and experience."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _supplemental_questions(prompt):
+    """Run one supplemental question prompt and return its non-empty lines"""
+    response = resources.llm_client().chat.completions.create(
         model="mistralai/Mixtral-8x7B-Instruct-v0.1",
         messages=[
-            {"role": "system", "content": "You are an expert technical interviewer. Generate relevant interview questions based on candidate's skills and experience."},
+            {"role": "system", "content": "You are an expert technical interviewer."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.7,
-        max_tokens=500
+        max_tokens=300
     )
     
+    new_questions = response.choices[0].message.content.strip().split('\n')
+    return [q.strip() for q in new_questions if q.strip()]
+
+def _start_supplemental_prompts(skills):
+    """Dispatch the supplemental prompts concurrently and return their futures"""
+    additional_prompts = [
+        f"Create 5 scenario-based questions for someone with experience in {', '.join(skills[:3])}",
+        f"Generate 5 coding interview questions related to {skills[0] if skills else 'general programming'}",
+        "Create 5 behavioral questions based on the candidate's experience"
+    ]
+    return [_question_executor.submit(_supplemental_questions, prompt) for prompt in additional_prompts]
+
+def _cancel(futures):
+    # Running calls cannot be interrupted; their results are simply ignored
+    for future in futures:
+        future.cancel()
+
+def _supplement_questions(skills, verified_questions, futures=None):
+    """Add questions from the supplemental prompts until there are enough.
+
+    Takes results in completion order and stops as soon as 10 questions exist,
+    ignoring any prompts still in flight.
+    """
+    futures = futures or _start_supplemental_prompts(skills)
+    try:
+        for future in as_completed(futures):
+            try:
+                verified_questions.extend(future.result())
+            except Exception as e:
+                print(f"Supplemental question prompt failed: {e}")
+                continue
+            
+            if len(verified_questions) >= 10:  # Stop once we have enough questions
+                break
+    finally:
+        _cancel(futures)
+    
+    return verified_questions
+
+def _speculative_prompts(skills):
+    """Start supplemental prompts alongside the primary one for resumes with sparse skills"""
+    if len(skills) < SPECULATIVE_SKILL_THRESHOLD:
+        return _start_supplemental_prompts(skills)
+    return None
+
+def generate_questions(skills=None, resume_text=None):
+    """Generate technical interview questions based on specified skills and resume context"""
+    if resume_text and not skills:
+        skills = extract_skills_from_resume(resume_text)
+    
+    if not skills or len(skills) == 0:
+        return ["No specific skills were identified. Please check the resume format."]
+    
+    # Extract experience sections from resume
+    experience_text = extract_experience(resume_text)
+    speculative = _speculative_prompts(skills)
+    
+    try:
+        response = resources.llm_client().chat.completions.create(
+            model="mistralai/Mixtral-8x7B-Instruct-v0.1",
+            messages=_question_messages(skills, experience_text),
+            temperature=0.7,
+            max_tokens=500
+        )
+    except Exception:
+        _cancel(speculative or [])
+        raise
+    
     questions = response.choices[0].message.content.strip().split('\n')
     questions = [q.strip() for q in questions if q.strip()]
     
-    # Verify each question mentions at least one skill or is relevant to experience
-    verified_questions = []
-    skills_lower = [s.lower() for s in skills]
-    
-    for q in questions:
-        is_relevant = any(skill.lower() in q.lower() for skill in skills) or \
-                     any(exp.lower() in q.lower() for exp in experience_text.split())
-        if is_relevant:
-            verified_questions.append(q)
+    # Keep questions that mention a skill or experience term, most relevant first
+    verified_questions = RelevanceIndex(skills, experience_text).rank(questions)
     
     # If we didn't get enough verified questions, try to generate more
     if len(verified_questions) < 5:
-        # Generate additional questions focusing on different aspects
-        additional_prompts = [
-            f"Create 5 scenario-based questions for someone with experience in {', '.join(skills[:3])}",
-            f"Generate 5 coding interview questions related to {skills[0] if skills else 'general programming'}",
-            "Create 5 behavioral questions based on the candidate's experience"
-        ]
-        
-        for prompt in additional_prompts:
-            response = client.chat.completions.create(
-                model="mistralai/Mixtral-8x7B-Instruct-v0.1",
-                messages=[
-                    {"role": "system", "content": "You are an expert technical interviewer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=300
-            )
-            
-            new_questions = response.choices[0].message.content.strip().split('\n')
-            new_questions = [q.strip() for q in new_questions if q.strip()]
-            verified_questions.extend(new_questions)
-            
-            if len(verified_questions) >= 10:  # Stop once we have enough questions
-                break
+        _supplement_questions(skills, verified_questions, speculative)
+    else:
+        _cancel(speculative or [])
     
     # Remove duplicates and return the final list
     return list(dict.fromkeys(verified_questions))[:15]  # Limit to 15 questions
 
-def generate_expected_answers(questions, skills=None, resume_text=None):
-    """Generate expected answers for each interview question"""
+def stream_questions(skills=None, resume_text=None):
+    """Yield interview questions one at a time as the LLM produces them.
+
+    Uses the streaming completion API and yields each verified question as
+    soon as its line is complete, followed by supplemental questions when too
+    few pass, up to 15 in total. Unlike ``generate_questions`` the questions
+    are not re-ranked by relevance: they keep arrival order, because callers
+    send each question's index to the client as it arrives.
+    """
+    if resume_text and not skills:
+        skills = extract_skills_from_resume(resume_text)
+    
+    if not skills or len(skills) == 0:
+        yield "No specific skills were identified. Please check the resume format."
+        return
+    
+    experience_text = extract_experience(resume_text)
+    relevance = RelevanceIndex(skills, experience_text)
+    seen = set()
+    
+    def accept(line):
+        q = line.strip()
+        if q and q not in seen and len(seen) < 15 and relevance.is_relevant(q):
+            seen.add(q)
+            return True
+        return False
+    
+    speculative = _speculative_prompts(skills)
+    try:
+        stream = resources.llm_client().chat.completions.create(
+            model="mistralai/Mixtral-8x7B-Instruct-v0.1",
+            messages=_question_messages(skills, experience_text),
+            temperature=0.7,
+            max_tokens=500,
+            stream=True
+        )
+        
+        buffer = ""
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            buffer += chunk.choices[0].delta.content or ""
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                if accept(line):
+                    yield line.strip()
+        if accept(buffer):
+            yield buffer.strip()
+    except BaseException:
+        _cancel(speculative or [])
+        raise
+    
+    if len(seen) < 5:
+        for q in _supplement_questions(skills, list(seen), speculative):
+            if q not in seen and len(seen) < 15:
+                seen.add(q)
+                yield q
+    else:
+        _cancel(speculative or [])
+
+def _generate_expected_answer(question, skills_text, experience_text):
+    """Generate the ideal answer for a single interview question"""
+    return _generate_expected_answer_with_usage(question, skills_text, experience_text)[0]
+
+def _generate_expected_answer_with_usage(question, skills_text, experience_text):
+    """Ideal answer for one question and the prompt tokens its request used"""
+    prompt = f"""
+    You are an expert interviewer evaluating responses to technical interview questions.
+    
+    Question: {question}
+    
+    Candidate Skills: {skills_text}
+    Candidate Experience: {experience_text}
+    
+    Generate an ideal answer to this question that would receive a perfect score.
+    The answer should be comprehensive but concise (150-250 words).
+    Include specific technical details where appropriate.
+    
+    Ideal Answer:
+    """
+    
+    started = time.perf_counter()
+    response = resources.llm_client().chat.completions.create(
+        model="mistralai/Mixtral-8x7B-Instruct-v0.1",
+        messages=[
+            {"role": "system", "content": "You are an expert technical interviewer creating model answers for evaluation."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=300
+    )
+    with _single_answer_lock:
+        _single_answer_timing["calls"] += 1
+        _single_answer_timing["seconds"] += time.perf_counter() - started
+    
+    usage = getattr(response, "usage", None)
+    return response.choices[0].message.content.strip(), getattr(usage, "prompt_tokens", 0) or 0
+
+def _single_answer_seconds():
+    """Mean latency of a single-question answer request, or None before the first one"""
+    with _single_answer_lock:
+        calls = _single_answer_timing["calls"]
+        return _single_answer_timing["seconds"] / calls if calls else None
+
+def _parse_answer_array(content, expected_count):
+    """Parse a JSON array of answers out of an LLM response.
+
+    Returns a list of ``expected_count`` entries; entries that could not be
+    parsed are ``None`` so the caller can retry them individually.
+    """
+    parsed = None
+    candidates = [content]
+    start, end = content.find('['), content.rfind(']')
+    if start != -1 and end > start:
+        candidates.append(content[start:end + 1])
+    
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+            break
+        except (ValueError, TypeError):
+            continue
+    
+    if isinstance(parsed, dict):
+        parsed = parsed.get("answers")
+    if not isinstance(parsed, list):
+        return [None] * expected_count
+    
+    answers = []
+    for i in range(expected_count):
+        item = parsed[i] if i < len(parsed) else None
+        if isinstance(item, dict):
+            item = item.get("answer")
+        answers.append(item.strip() if isinstance(item, str) and item.strip() else None)
+    return answers
+
+def _generate_expected_answer_chunk(questions, skills_text, experience_text):
+    """Generate ideal answers for several questions with a single structured request"""
+    numbered = "\n".join(f"{i + 1}. {q}" for i, q in enumerate(questions))
+    prompt = f"""
+    You are an expert interviewer evaluating responses to technical interview questions.
+    
+    Candidate Skills: {skills_text}
+    Candidate Experience: {experience_text}
+    
+    Questions:
+    {numbered}
+    
+    For each question, generate an ideal answer that would receive a perfect score.
+    Each answer should be comprehensive but concise (150-250 words).
+    Include specific technical details where appropriate.
+    
+    Return ONLY a JSON array of {len(questions)} strings, one answer per question, in the same order.
+    """
+    
+    response = resources.llm_client().chat.completions.create(
+        model="mistralai/Mixtral-8x7B-Instruct-v0.1",
+        messages=[
+            {"role": "system", "content": "You are an expert technical interviewer creating model answers for evaluation. You respond with valid JSON only."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=300 * len(questions)
+    )
+    
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    answers = _parse_answer_array(response.choices[0].message.content.strip(), len(questions))
+    return answers, prompt_tokens
+
+def generate_expected_answers_batched(questions, skills=None, resume_text=None, batch_size=None):
+    """Generate expected answers by sending chunks of questions in one request each.
+
+    The shared skills/experience context is sent once per chunk instead of once
+    per question. Answers that fail to parse fall back to per-question calls.
+    """
     if not questions:
         return []
-        
-    # Extract experience for context
+    
+    started = time.perf_counter()
     experience_text = extract_experience(resume_text) if resume_text else ""
     skills_text = ", ".join(skills) if skills else ""
+    size = max(1, batch_size or EXPECTED_ANSWER_BATCH_SIZE)
+    chunks = [questions[i:i + size] for i in range(0, len(questions), size)]
     
-    expected_answers = []
+    answers = []
+    prompt_tokens = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(EXPECTED_ANSWER_WORKERS, len(chunks)))) as executor:
+        futures = [executor.submit(_generate_expected_answer_chunk, chunk, skills_text, experience_text) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                chunk_answers, chunk_tokens = future.result()
+            except Exception as e:
+                print(f"Batched answer generation failed for chunk: {e}")
+                chunk_answers, chunk_tokens = [None] * len(chunk), 0
+            answers.extend(chunk_answers)
+            prompt_tokens += chunk_tokens
     
-    for question in questions:
-        prompt = f"""
-        You are an expert interviewer evaluating responses to technical interview questions.
-        
-        Question: {question}
-        
-        Candidate Skills: {skills_text}
-        Candidate Experience: {experience_text}
-        
-        Generate an ideal answer to this question that would receive a perfect score.
-        The answer should be comprehensive but concise (150-250 words).
-        Include specific technical details where appropriate.
-        
-        Ideal Answer:
-        """
-        
-        response = client.chat.completions.create(
-            model="mistralai/Mixtral-8x7B-Instruct-v0.1",
-            messages=[
-                {"role": "system", "content": "You are an expert technical interviewer creating model answers for evaluation."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=300
-        )
+    # Retry only the entries the batched responses did not cover
+    missing = [i for i, answer in enumerate(answers) if answer is None]
+    if missing:
+        print(f"Falling back to per-question generation for {len(missing)} of {len(questions)} answers")
+        workers = max(1, min(EXPECTED_ANSWER_WORKERS, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            retried = executor.map(
+                lambda q: _generate_expected_answer_with_usage(q, skills_text, experience_text),
+                [questions[i] for i in missing]
+            )
+            for i, (answer, tokens) in zip(missing, retried):
+                answers[i] = answer
+                prompt_tokens += tokens
+    
+    # Per-question prompts repeat the shared context once per question; batching sends
+    # it once per chunk (token count estimated at ~4 characters per token)
+    context_tokens = (len(skills_text) + len(experience_text)) // 4
+    tokens_saved = context_tokens * max(0, len(questions) - len(missing) - len(chunks))
+    elapsed = time.perf_counter() - started
+    # Per-question mode would need ceil(n / workers) rounds of single-question requests
+    single_seconds = _single_answer_seconds()
+    if single_seconds is None:
+        latency_saved = "latency saved unknown (no single-question timing yet)"
+    else:
+        rounds = -(-len(questions) // max(1, EXPECTED_ANSWER_WORKERS))
+        latency_saved = f"~{rounds * single_seconds - elapsed:.2f}s latency saved"
+    print(f"Batched expected answers: {len(questions)} questions in {len(chunks)} request(s), "
+          f"{prompt_tokens} prompt tokens incl. fallbacks (~{tokens_saved} saved), {elapsed:.2f}s, "
+          f"{latency_saved}, {len(missing)} fallback call(s)")
+    return answers
+
+def _generate_expected_answers_parallel(questions, skills_text, experience_text, max_workers=None):
+    """Generate one answer per question using a bounded thread pool"""
+    workers = max(1, min(max_workers or EXPECTED_ANSWER_WORKERS, len(questions)))
+    if workers == 1:
+        return [_generate_expected_answer(q, skills_text, experience_text) for q in questions]
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() yields results in submission order, so answers line up with questions
+        return list(executor.map(
+            lambda q: _generate_expected_answer(q, skills_text, experience_text),
+            questions
+        ))
+
+def iter_expected_answers(questions, skills=None, resume_text=None, max_workers=None):
+    """Yield ``(index, answer)`` pairs in completion order rather than question order"""
+    if not questions:
+        return
+    
+    experience_text = extract_experience(resume_text) if resume_text else ""
+    skills_text = ", ".join(skills) if skills else ""
+    workers = max(1, min(max_workers or EXPECTED_ANSWER_WORKERS, len(questions)))
+    
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_generate_expected_answer, q, skills_text, experience_text): i
+            for i, q in enumerate(questions)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # When the consumer stops early (e.g. a client disconnect closes the
+        # generator), drop queued prompts instead of waiting for every answer
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def generate_expected_answers(questions, skills=None, resume_text=None, max_workers=None, mode=None):
+    """Generate expected answers for each interview question.
+
+    In ``parallel`` mode questions are answered concurrently by up to
+    ``max_workers`` threads; in ``batched`` mode several questions share one
+    structured request. The output always keeps question order.
+    """
+    if not questions:
+        return []
+    
+    if (mode or EXPECTED_ANSWER_MODE) == "batched":
+        return generate_expected_answers_batched(questions, skills=skills, resume_text=resume_text)
         
-        answer = response.choices[0].message.content.strip()
-        expected_answers.append(answer)
+    # Extract experience for context
+    experience_text = extract_experience(resume_text) if resume_text else ""
+    skills_text = ", ".join(skills) if skills else ""
     
-    return expected_answers
+    return _generate_expected_answers_parallel(questions, skills_text, experience_text, max_workers)
 
 def extract_experience(resume_text):
     """Extract relevant experience sections from the resume"""
-    experience_sections = []
-    
-    # Look for common experience section headers
-    experience_headers = ['experience', 'work experience', 'professional experience',
-                         'employment history', 'career history']
-    
-    for header in experience_headers:
-        pattern = rf'(?i){header}\s*[:-]\s*(.*?)(?=\w+\s*[:|\n]|$)'
-        matches = re.finditer(pattern, resume_text, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            experience_sections.append(match.group(1).strip())
+    experience = get_section(resume_text, "experience")
+    if experience:
+        return experience[:EXPERIENCE_MAX_CHARS]
     
     # If no experience sections found, try to extract job titles and companies
-    if not experience_sections:
-        pattern = r'\b(?:[A-Z][a-z]+\s*){2,}(?:at|in|for|with)\s+(?:[A-Z][a-z]+\s*){2,}\b'
-        matches = re.finditer(pattern, resume_text)
-        for match in matches:
-            experience_sections.append(match.group(0))
+    experience_sections = [match.group(0) for match in JOB_TITLE_RE.finditer(resume_text or "")]
     
-    return '\n'.join(experience_sections)
+    return '\n'.join(experience_sections)[:EXPERIENCE_MAX_CHARS]
 
 def extract_info(text):
     """Extract information from resume text"""
@@ -0,0 +1,43 @@
+from utils.scoring import tokenize
+
+# A skill mention counts more than a shared experience term
+SKILL_WEIGHT = 2.0
+EXPERIENCE_WEIGHT = 1.0
+
+
+class RelevanceIndex:
+    """Token sets built once per resume for scoring candidate interview questions.
+
+    Scoring a question costs one tokenization plus set lookups, instead of a
+    substring scan per skill and per experience word.
+    """
+
+    def __init__(self, skills, experience_text):
+        self.single_skills = set()
+        self.phrase_skills = set()
+        for skill in skills or []:
+            tokens = tokenize(skill)
+            if len(tokens) == 1:
+                self.single_skills.add(tokens[0])
+            elif tokens:
+                self.phrase_skills.add(" ".join(tokens))
+        self.experience_terms = {t for t in tokenize(experience_text) if len(t) > 2}
+
+    def score(self, question):
+        """Weighted count of skills and experience terms the question mentions"""
+        tokens = tokenize(question)
+        token_set = set(tokens)
+        skill_hits = len(token_set & self.single_skills)
+        if self.phrase_skills:
+            joined = f" {' '.join(tokens)} "
+            skill_hits += sum(1 for phrase in self.phrase_skills if f" {phrase} " in joined)
+        experience_hits = len(token_set & self.experience_terms)
+        return SKILL_WEIGHT * skill_hits + EXPERIENCE_WEIGHT * experience_hits
+
+    def is_relevant(self, question):
+        return self.score(question) > 0
+
+    def rank(self, questions):
+        """Relevant questions ordered from most to least relevant (ties keep input order)"""
+        scored = [(self.score(q), i, q) for i, q in enumerate(questions)]
+        return [q for score, i, q in sorted(scored, key=lambda item: (-item[0], item[1])) if score > 0]
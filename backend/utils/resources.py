@@ -0,0 +1,90 @@
+"""Lazy registry for heavy shared resources (spaCy model, NLTK data, LLM client).
+
+Each resource is built by its factory on first ``get`` and then shared by every
+caller in the process. ``warm_up`` can build them ahead of time, either in a
+background thread or synchronously in the gunicorn master before workers fork
+so the loaded models are shared copy-on-write.
+"""
+import os
+import threading
+import time
+
+_factories = {}
+_instances = {}
+_locks = {}
+_init_times = {}
+_registry_lock = threading.Lock()
+
+
+def register(name, factory):
+    """Register a zero-argument factory that builds the resource ``name``"""
+    with _registry_lock:
+        _factories[name] = factory
+        _locks.setdefault(name, threading.Lock())
+
+
+def get(name):
+    """Return the resource ``name``, building it on first use"""
+    if name in _instances:
+        return _instances[name]
+    lock = _locks.get(name)
+    if lock is None:
+        raise KeyError(f"Unknown resource: {name}")
+    with lock:
+        if name not in _instances:
+            started = time.perf_counter()
+            _instances[name] = _factories[name]()
+            record_timing(name, time.perf_counter() - started)
+            print(f"✅ Loaded {name} in {_init_times[name]['seconds']:.2f}s")
+    return _instances[name]
+
+
+def record_timing(name, seconds):
+    """Record how long initializing ``name`` took"""
+    _init_times[name] = {
+        "seconds": round(seconds, 4),
+        "pid": os.getpid(),
+        "thread": threading.current_thread().name
+    }
+
+
+def init_times():
+    """Per-resource initialization timings recorded in this process"""
+    return {
+        "resources": dict(_init_times),
+        "loaded": sorted(_instances),
+        "pending": sorted(set(_factories) - set(_instances))
+    }
+
+
+def warm_up(names=None, background=True):
+    """Build the given resources (all registered ones by default) ahead of first use"""
+    names = list(names or _factories)
+
+    def load_all():
+        for name in names:
+            try:
+                get(name)
+            except Exception as e:
+                print(f"⚠️ Warm-up of {name} failed: {e}")
+
+    if not background:
+        load_all()
+        return None
+    thread = threading.Thread(target=load_all, name="resource-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _build_llm_client():
+    # Imported here so modules that never call the LLM do not need the HTTP stack
+    from utils.llm_transport import build_llm_client
+    return build_llm_client()
+
+
+register("llm_client", _build_llm_client)
+
+
+def llm_client():
+    """Shared OpenAI-compatible client used by all modules"""
+    return get("llm_client")
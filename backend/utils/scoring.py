@@ -0,0 +1,109 @@
+import math
+import os
+import re
+
+from utils import resources
+from utils.cache import TTLCache
+
+# Weight of TF-IDF similarity vs. concept coverage in the final score
+SIMILARITY_WEIGHT = float(os.getenv("SCORE_SIMILARITY_WEIGHT", "0.6"))
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS_FILE = os.path.join(os.path.dirname(__file__), "data", "stopwords.txt")
+
+# Vectorized expected answers, keyed by question set id
+_index_cache = TTLCache(maxsize=int(os.getenv("SCORING_INDEX_CACHE_SIZE", "256")), ttl=3600)
+
+
+def _load_stopwords():
+    """Bundled English stopwords, so scoring never waits on an NLTK download"""
+    with open(STOPWORDS_FILE, encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+resources.register("stopwords", _load_stopwords)
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed"""
+    stop_words = resources.get("stopwords")
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in stop_words]
+
+
+def _term_counts(tokens):
+    counts = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def _vectorize(tokens, idf, default_idf):
+    """L2-normalized sparse TF-IDF vector as a {term: weight} dict"""
+    vector = {term: count * idf.get(term, default_idf) for term, count in _term_counts(tokens).items()}
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {term: w / norm for term, w in vector.items()} if norm else {}
+
+
+def build_answer_index(expected_answers):
+    """Vectorize the expected answers of a question set against their own IDF"""
+    documents = [tokenize(answer) for answer in expected_answers]
+    doc_freq = {}
+    for tokens in documents:
+        for term in set(tokens):
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+
+    n = len(documents)
+    idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in doc_freq.items()}
+    # Terms that appear in no expected answer are as specific as the rarest known term
+    default_idf = math.log(1 + n) + 1
+    return {
+        "idf": idf,
+        "default_idf": default_idf,
+        "vectors": [_vectorize(tokens, idf, default_idf) for tokens in documents]
+    }
+
+
+def get_answer_index(question_set_id, expected_answers):
+    """Return the cached index for a question set, building it on first use"""
+    index = _index_cache.get(question_set_id)
+    if index is None:
+        index = build_answer_index(expected_answers)
+        _index_cache.set(question_set_id, index)
+    return index
+
+
+def score_answer(user_answer, index, question_index, expected_keywords=None):
+    """Score a submitted answer locally against its expected answer.
+
+    Returns cosine similarity of the TF-IDF vectors, the fraction of expected
+    concepts covered, and a combined 0-100 score.
+    """
+    tokens = tokenize(user_answer)
+    user_vector = _vectorize(tokens, index["idf"], index["default_idf"])
+    expected_vector = index["vectors"][question_index]
+    if len(user_vector) > len(expected_vector):
+        user_vector, expected_vector = expected_vector, user_vector
+    similarity = sum(w * expected_vector.get(term, 0.0) for term, w in user_vector.items())
+
+    token_set = set(tokens)
+    covered, missing = [], []
+    for keyword in expected_keywords or []:
+        keyword_tokens = tokenize(keyword)
+        if keyword_tokens and all(t in token_set for t in keyword_tokens):
+            covered.append(keyword)
+        else:
+            missing.append(keyword)
+    concepts = len(covered) + len(missing)
+
+    if concepts:
+        coverage = len(covered) / concepts
+        combined = SIMILARITY_WEIGHT * similarity + (1 - SIMILARITY_WEIGHT) * coverage
+    else:
+        coverage = None
+        combined = similarity
+
+    return {
+        "score": round(100 * combined),
+        "similarity": round(similarity, 4),
+        "concept_coverage": round(coverage, 4) if coverage is not None else None,
+        "missing_concepts": missing
+    }
@@ -0,0 +1,58 @@
+import re
+from functools import lru_cache
+
+# Section name -> header spellings recognised in resumes
+SECTION_HEADERS = {
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "career history", "work history", "employment", "internships", "internship"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tech stack", "skills and tools"],
+    "education": ["education", "academic background", "academic qualifications", "qualifications"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    # Recognised only so they end the sections above
+    "summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me"],
+    "certifications": ["certifications", "certificates", "licenses"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments"],
+    "other": ["publications", "interests", "hobbies", "languages", "references", "volunteering",
+              "extracurricular activities", "activities"]
+}
+
+_HEADER_NAMES = {alias: name for name, aliases in SECTION_HEADERS.items() for alias in aliases}
+# Longest spellings first so "work experience" wins over "experience"
+_ALIASES = "|".join(re.escape(a) for a in sorted(_HEADER_NAMES, key=len, reverse=True))
+
+# A header is either a line of its own ("EXPERIENCE", "## Skills:") or a spelling
+# followed by a colon anywhere ("Skills: Python, SQL"). No two quantifiers can
+# compete for the same characters (trailing spaces before and after the optional
+# colon are matched only one way), so a scan is linear in the length of the text.
+HEADER_RE = re.compile(
+    rf"^[ \t#*•\-]*(?P<line>{_ALIASES})[ \t]*(?:[:\-–][ \t]*)?$|\b(?P<inline>{_ALIASES})[ \t]*:",
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+@lru_cache(maxsize=64)
+def segment_resume(text):
+    """Split resume text into named sections in a single pass.
+
+    Returns a dict mapping section names (experience, skills, education,
+    projects, ...) to their text; repeated sections are joined with newlines.
+    """
+    sections = {}
+    if not text:
+        return sections
+
+    matches = list(HEADER_RE.finditer(text))
+    for current, following in zip(matches, matches[1:] + [None]):
+        header = (current.group("line") or current.group("inline")).lower()
+        name = _HEADER_NAMES[header]
+        end = following.start() if following else len(text)
+        content = text[current.end():end].strip()
+        if content:
+            sections[name] = f"{sections[name]}\n{content}" if name in sections else content
+    return sections
+
+
+def get_section(text, name):
+    """Text of one section of the resume, or an empty string"""
+    return segment_resume(text or "").get(name, "")
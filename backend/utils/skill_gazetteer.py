@@ -0,0 +1,280 @@
+import os
+import re
+import threading
+from collections import deque
+
+from utils import resources
+
+SKILLS_FILE = os.path.join(os.path.dirname(__file__), "data", "skills.txt")
+# Resumes with fewer gazetteer hits than this also go through the LLM extractor
+MIN_GAZETTEER_SKILLS = int(os.getenv("MIN_GAZETTEER_SKILLS", "5"))
+# Skills the LLM extractor returned at least this often are added to the taxonomy,
+# most frequent first and at most LEARNED_SKILLS_LIMIT of them
+LEARNED_SKILLS_MIN_COUNT = int(os.getenv("LEARNED_SKILLS_MIN_COUNT", "2"))
+LEARNED_SKILLS_LIMIT = int(os.getenv("LEARNED_SKILLS_LIMIT", "2000"))
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text):
+    """Collapse whitespace so multi-word names match across line breaks"""
+    return WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+class _Automaton:
+    """Aho-Corasick automaton over characters, reporting (start, end, pattern id)"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for pattern_id, pattern in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((len(pattern), pattern_id))
+
+        # Breadth-first construction of failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        state = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, pattern_id in out[state]:
+                yield i + 1 - length, i + 1, pattern_id
+
+
+def _is_word_char(ch):
+    return ch.isalnum()
+
+
+# Punctuation that separates entries of a skills list ("Skills: C, Go | R")
+LIST_DELIMITERS = set(",;|/:•·()[]")
+
+
+def _in_list_context(text, start, end):
+    """Whether text[start:end] is set off by list punctuation rather than sitting in prose.
+
+    Case-sensitive names are also ordinary words or letters ("Go", "Spring",
+    "Grade C", "R&D"), so they only count as skills inside a list.
+    """
+    if text[start - 1:start] == "&" or text[end:end + 1] == "&":
+        return False
+    before = text[:start].rstrip()
+    after = text[end:].lstrip()
+    return bool(before and before[-1] in LIST_DELIMITERS) or bool(after and after[0] in LIST_DELIMITERS)
+
+
+class SkillGazetteer:
+    """Skill names and aliases compiled into automata for single-pass matching.
+
+    Names are matched case-insensitively unless registered as case-sensitive,
+    only on word boundaries, preferring the longest match where they overlap.
+    Case-sensitive names must also appear in a list (see ``_in_list_context``).
+    """
+
+    def __init__(self):
+        self._names = {}  # canonical lowercase -> display name
+        self._aliases = {}  # (alias, case_sensitive) -> canonical lowercase
+        self._non_technical = set()  # canonical lowercase names of soft skills
+        self._compiled = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def knows(self, name):
+        """Whether ``name`` is already a skill or an alias of one, in any capitalization"""
+        name = normalize(name)
+        key = name.lower()
+        return key in self._names or (key, False) in self._aliases or any(
+            cs and alias.lower() == key for alias, cs in self._aliases
+        )
+
+    def add(self, name, aliases=(), case_sensitive=False, technical=True):
+        """Add a skill and its ``(alias, case_sensitive)`` pairs; returns True if the skill was new.
+
+        Existing aliases are never remapped or loosened, so adding "Go" again
+        cannot turn the case-sensitive, list-only "=Go" into a plain alias.
+        """
+        name = normalize(name)
+        if not name:
+            return False
+        key = name.lower()
+        with self._lock:
+            is_new = key not in self._names
+            self._names.setdefault(key, name)
+            if is_new and not technical:
+                self._non_technical.add(key)
+            for alias, alias_cs in ([(name, case_sensitive)] if is_new else []) + list(aliases):
+                alias = normalize(alias)
+                if alias:
+                    self._aliases.setdefault((alias if alias_cs else alias.lower(), alias_cs), key)
+            self._compiled = None
+        return is_new
+
+    def count_technical(self, skills):
+        """How many of ``skills`` (names returned by ``find``) are technical"""
+        return sum(1 for skill in skills if skill.lower() not in self._non_technical)
+
+    def load_file(self, path=SKILLS_FILE):
+        """Load ``Canonical | alias | ...`` lines.
+
+        ``=Name`` marks case-sensitive names; a leading ``~`` marks a
+        non-technical skill (see ``count_technical``).
+        """
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                technical = not line.startswith("~")
+                line = line.lstrip("~")
+                entries = [(e.strip().lstrip("="), e.strip().startswith("=")) for e in line.split("|")]
+                (name, case_sensitive), aliases = entries[0], entries[1:]
+                self.add(name, aliases, case_sensitive, technical)
+        return self
+
+    def _compile(self):
+        with self._lock:
+            if self._compiled is None:
+                alias_items = list(self._aliases.items())
+                insensitive = [(i, alias) for i, ((alias, cs), _) in enumerate(alias_items) if not cs]
+                sensitive = [(i, alias) for i, ((alias, cs), _) in enumerate(alias_items) if cs]
+                self._compiled = (
+                    _Automaton(insensitive),
+                    _Automaton(sensitive),
+                    [canonical for _, canonical in alias_items],
+                    dict(self._names)
+                )
+            return self._compiled
+
+    def find(self, text):
+        """Return the canonical names of all skills mentioned in ``text``, in order of appearance"""
+        insensitive, sensitive, canonicals, names = self._compile()
+        text = normalize(text)
+        # Lowercasing can change string length for a few non-ASCII characters, so
+        # each automaton checks word boundaries against the text it scanned
+        matches = []
+        for automaton, scanned, list_only in ((insensitive, text.lower(), False), (sensitive, text, True)):
+            for start, end, pattern_id in automaton.iter_matches(scanned):
+                if start > 0 and _is_word_char(scanned[start - 1]) and _is_word_char(scanned[start]):
+                    continue
+                if end < len(scanned) and _is_word_char(scanned[end]) and _is_word_char(scanned[end - 1]):
+                    continue
+                if list_only and not _in_list_context(scanned, start, end):
+                    continue
+                matches.append((start, -(end - start), pattern_id))
+
+        # Keep the longest of overlapping matches, e.g. "C++" over "C"
+        matches.sort()
+        found = []
+        seen = set()
+        covered_until = -1
+        for start, neg_length, pattern_id in matches:
+            if start < covered_until:
+                continue
+            covered_until = start - neg_length
+            canonical = canonicals[pattern_id]
+            if canonical not in seen:
+                seen.add(canonical)
+                found.append(names[canonical])
+        return found
+
+    def extend_from_collection(self, collection, min_count=LEARNED_SKILLS_MIN_COUNT, limit=LEARNED_SKILLS_LIMIT):
+        """Add learned skills (see ``record_llm_skills``) seen at least ``min_count`` times"""
+        added = 0
+        docs = collection.find({"count": {"$gte": min_count}}, {"name": 1}).sort("count", -1).limit(limit)
+        for doc in docs:
+            name = doc.get("name", "")
+            # Known names keep their curated aliases and matching rules
+            if not self.knows(name) and self.add(name):
+                added += 1
+        return added
+
+
+def _is_plausible_skill(name):
+    # Skip sentence-like strings the LLM sometimes returns as "skills"
+    return 2 <= len(name) <= 40 and len(name.split()) <= 4
+
+
+def _load_default_gazetteer():
+    return SkillGazetteer().load_file()
+
+
+resources.register("skill_gazetteer", _load_default_gazetteer)
+
+
+def find_skills(text):
+    """Skills from the shared gazetteer found in ``text``"""
+    return resources.get("skill_gazetteer").find(text)
+
+
+def count_technical_skills(skills):
+    """Technical skills among ``find_skills`` results; only these count toward MIN_GAZETTEER_SKILLS"""
+    return resources.get("skill_gazetteer").count_technical(skills)
+
+
+_learned_collection = None
+
+
+def attach_collection(collection):
+    """Persist LLM-extracted skills to ``collection`` (``None`` detaches)"""
+    global _learned_collection
+    _learned_collection = collection
+
+
+def record_llm_skills(skills):
+    """Count skills returned by the LLM extractor so frequent ones join the taxonomy"""
+    if _learned_collection is None:
+        return
+    from pymongo import UpdateOne
+
+    names = {}
+    for skill in skills or []:
+        name = normalize(skill)
+        if _is_plausible_skill(name):
+            names.setdefault(name.lower(), name)
+    if not names:
+        return
+    try:
+        _learned_collection.bulk_write([
+            UpdateOne({"_id": key}, {"$inc": {"count": 1}, "$setOnInsert": {"name": name}}, upsert=True)
+            for key, name in names.items()
+        ], ordered=False)
+    except Exception as e:
+        print(f"⚠️ Failed to record learned skills: {e}")
+
+
+def refresh_from_collection(collection=None, min_count=LEARNED_SKILLS_MIN_COUNT, limit=LEARNED_SKILLS_LIMIT):
+    """Extend the shared gazetteer with skills the LLM extractor returned repeatedly"""
+    collection = collection if collection is not None else _learned_collection
+    if collection is None:
+        return 0
+    try:
+        added = resources.get("skill_gazetteer").extend_from_collection(collection, min_count, limit)
+        print(f"✅ Skill gazetteer extended with {added} learned skills")
+        return added
+    except Exception as e:
+        print(f"⚠️ Skill gazetteer refresh failed: {e}")
+        return 0